@@ -32,6 +32,8 @@ import sqlite3
 import sys
 from pathlib import Path
 
+from sqlalchemy import delete
+
 # Add service directory to path for imports (ocr-pipeline-python)
 PROJECT_ROOT = Path(__file__).parent
 OCR_SERVICE_ROOT = PROJECT_ROOT / "services" / "ocr-pipeline-python"
@@ -74,13 +76,11 @@ def clear_by_invoice_number(invoice_number: str):
     """
     # Clean from Document table
     with db.session_scope() as s:
-        deleted_docs = (
-            s.query(db.Document)
-            .filter(
-                db.Document.raw_json.like(f'%"invoice_number": "{invoice_number}"%')
-            )
-            .delete(synchronize_session=False)
-        )
+        deleted_docs = s.execute(
+            delete(db.Document)
+            .where(db.Document.raw_json.like(f'%"invoice_number": "{invoice_number}"%'))
+            .execution_options(synchronize_session=False)
+        ).rowcount
 
     # Clean from invoices table
     conn = sqlite3.connect("data/app.db")
@@ -107,9 +107,11 @@ def clear_by_file(file_path: str):
     file_hash = compute_file_hash(file_path)
 
     with db.session_scope() as s:
-        deleted = (
-            s.query(db.Document).filter(db.Document.file_hash == file_hash).delete()
-        )
+        deleted = s.execute(
+            delete(db.Document)
+            .where(db.Document.file_hash == file_hash)
+            .execution_options(synchronize_session=False)
+        ).rowcount
 
     print(f"✅ Deleted {deleted} entries for file: {file_path}")
     print(f"   File hash: {file_hash}")
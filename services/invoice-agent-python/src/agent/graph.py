@@ -200,11 +200,8 @@ def save_to_memory(
         sql=sql,
     )
     
-    # Append to memory
-    memory_store.append_turn(session_id, turn)
-    
-    # Trim to keep only last N turns
-    memory_store.trim_history(session_id)
+    # Append to memory, keeping only the last N turns
+    memory_store.add_turn(session_id, turn)
     
     logger.info(f"[SaveToMemory] Saved turn to memory for session {session_id}")
 
@@ -29,8 +29,8 @@ def receive_question(
     
     logger.info(f"[ReceiveQuestion] session_id={session_id}, question={question}")
     
-    # Retrieve conversation history
-    history_turns = memory_store.get_history(session_id)
+    # Retrieve conversation history (bounded to the configured turn limit)
+    history_turns = memory_store.get_recent_history(session_id)
     
     # Convert to state format
     history = [
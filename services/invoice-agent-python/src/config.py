@@ -18,9 +18,14 @@ class Settings(BaseSettings):
     # MCP Settings
     mcp_endpoint: str = "http://localhost:8200"
     mcp_timeout: float = 10.0
+    mcp_schema_cache_ttl: float = 300.0
+    mcp_query_cache_ttl: float = 30.0
+    mcp_query_cache_size: int = 128
 
     # Memory Settings
     max_history_turns: int = 5
+    session_ttl_seconds: int = 3600
+    session_cleanup_interval_seconds: int = 300
 
     # SQL Validation Settings
     sql_max_rows: int = 200
@@ -5,6 +5,8 @@ Stores conversation turns in RAM to support contextual follow-up questions
 like "and the invoice?" or "what about that product?".
 """
 
+import threading
+import time
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
@@ -29,6 +31,14 @@ class MemoryStore:
 
     _sessions: Dict[str, List[ConversationTurn]] = field(default_factory=dict)
     max_turns: int = 5
+    # Monotonic timestamp of the last turn stored per session, used to expire
+    # idle sessions (see cleanup_expired_sessions)
+    _last_active: Dict[str, float] = field(default_factory=dict)
+    # Requests run the graph in worker threads and the TTL cleanup runs in
+    # another one, so every access to the dicts above goes through this lock
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
 
     def get_history(self, session_id: str) -> List[ConversationTurn]:
         """
@@ -40,7 +50,35 @@ class MemoryStore:
         Returns:
             List of conversation turns (empty if session doesn't exist)
         """
-        return self._sessions.get(session_id, [])
+        with self._lock:
+            return list(self._sessions.get(session_id, []))
+
+    def get_recent_history(
+        self,
+        session_id: str,
+        max_turns: Optional[int] = None,
+    ) -> List[ConversationTurn]:
+        """
+        Retrieve only the last N turns of a session.
+        
+        Keeps the prompt size bounded even if a session grew past the limit
+        (e.g. through append_turn() without a trim).
+        
+        Args:
+            session_id: Unique identifier for the session
+            max_turns: Maximum number of turns to return (defaults to self.max_turns)
+            
+        Returns:
+            The most recent conversation turns, oldest first
+        """
+        limit = max_turns if max_turns is not None else self.max_turns
+        with self._lock:
+            history = self._sessions.get(session_id)
+            if not history:
+                return []
+            if 0 < limit < len(history):
+                return history[-limit:]
+            return list(history)
 
     def append_turn(
         self,
@@ -54,10 +92,38 @@ class MemoryStore:
             session_id: Unique identifier for the session
             turn: The conversation turn to append
         """
-        if session_id not in self._sessions:
-            self._sessions[session_id] = []
+        with self._lock:
+            if session_id not in self._sessions:
+                self._sessions[session_id] = []
+
+            self._sessions[session_id].append(turn)
+            self._last_active[session_id] = time.monotonic()
+
+    def add_turn(
+        self,
+        session_id: str,
+        turn: ConversationTurn,
+        max_turns: Optional[int] = None,
+    ) -> None:
+        """
+        Append a turn and trim the session to the last N turns in one step.
+        
+        Equivalent to append_turn() followed by trim_history(), but looks the
+        session up once and drops old turns in place instead of copying.
+        
+        Args:
+            session_id: Unique identifier for the session
+            turn: The conversation turn to append
+            max_turns: Maximum number of turns to keep (defaults to self.max_turns)
+        """
+        limit = max_turns if max_turns is not None else self.max_turns
         
-        self._sessions[session_id].append(turn)
+        with self._lock:
+            history = self._sessions.setdefault(session_id, [])
+            history.append(turn)
+            if 0 < limit < len(history):
+                del history[: len(history) - limit]
+            self._last_active[session_id] = time.monotonic()
 
     def trim_history(
         self,
@@ -73,8 +139,9 @@ class MemoryStore:
         """
         limit = max_turns if max_turns is not None else self.max_turns
         
-        if session_id in self._sessions:
-            self._sessions[session_id] = self._sessions[session_id][-limit:]
+        with self._lock:
+            if session_id in self._sessions:
+                self._sessions[session_id] = self._sessions[session_id][-limit:]
 
     def clear_session(self, session_id: str) -> None:
         """
@@ -83,9 +150,34 @@ class MemoryStore:
         Args:
             session_id: Unique identifier for the session
         """
-        if session_id in self._sessions:
-            del self._sessions[session_id]
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._last_active.pop(session_id, None)
+
+    def cleanup_expired_sessions(self, ttl_seconds: float) -> int:
+        """
+        Drop sessions that have not stored a turn within the last ttl_seconds.
+        
+        Args:
+            ttl_seconds: Idle time after which a session is discarded
+            
+        Returns:
+            Number of sessions removed
+        """
+        cutoff = time.monotonic() - ttl_seconds
+        with self._lock:
+            expired = [
+                session_id
+                for session_id, last_active in self._last_active.items()
+                if last_active < cutoff
+            ]
+            for session_id in expired:
+                self._sessions.pop(session_id, None)
+                self._last_active.pop(session_id, None)
+        return len(expired)
 
     def clear_all(self) -> None:
         """Clear all sessions from memory."""
-        self._sessions.clear()
+        with self._lock:
+            self._sessions.clear()
+            self._last_active.clear()
@@ -53,6 +53,9 @@ def get_mcp_client() -> MCPClient:
     client = MCPClient(
         base_url=settings.mcp_endpoint,
         timeout=settings.mcp_timeout,
+        schema_cache_ttl=settings.mcp_schema_cache_ttl,
+        query_cache_ttl=settings.mcp_query_cache_ttl,
+        query_cache_size=settings.mcp_query_cache_size,
     )
     
     logger.info(f"[DI] MCP client initialized: {settings.mcp_endpoint}")
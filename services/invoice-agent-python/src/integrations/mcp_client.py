@@ -5,7 +5,11 @@ This client handles all database access through the MCP protocol.
 Direct database access is not allowed - all queries must go through MCP.
 """
 
-from typing import Any, Dict, Optional
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
 import httpx
 from loguru import logger
@@ -32,6 +36,9 @@ class MCPClient:
         self,
         base_url: str,
         timeout: float = 10.0,
+        schema_cache_ttl: float = 300.0,
+        query_cache_ttl: float = 30.0,
+        query_cache_size: int = 128,
     ) -> None:
         """
         Initialize MCP client.
@@ -39,9 +46,21 @@ class MCPClient:
         Args:
             base_url: Base URL of the MCP server
             timeout: Request timeout in seconds
+            schema_cache_ttl: Seconds to reuse the rendered schema text (0 disables)
+            query_cache_ttl: Seconds to reuse the result of an identical query (0 disables)
+            query_cache_size: Maximum number of query results kept
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.schema_cache_ttl = schema_cache_ttl
+        # (monotonic timestamp, schema text) of the last successful get_schema_text()
+        self._schema_text_cache: Optional[Tuple[float, str]] = None
+        self._schema_lock = threading.Lock()
+        self.query_cache_ttl = query_cache_ttl
+        self.query_cache_size = query_cache_size
+        # LRU of query text -> (monotonic timestamp, result)
+        self._query_cache: "OrderedDict[str, Tuple[float, QueryResult]]" = OrderedDict()
+        self._query_lock = threading.Lock()
 
     def get_schema(self) -> SchemaInfo:
         """
@@ -144,14 +163,45 @@ class MCPClient:
         """
         Get a human-readable text representation of the schema in English.
         
+        The schema is effectively static, so the rendered text is reused for
+        schema_cache_ttl seconds instead of calling MCP on every question.
+        
         Returns:
             Schema as formatted text string
             
         Raises:
             MCPError: If the request fails
         """
-        schema_info = self.get_schema()
-        
+        if self.schema_cache_ttl <= 0:
+            return self._fetch_schema_text()
+
+        cached = self._schema_text_cache
+        if cached is not None and time.monotonic() - cached[0] < self.schema_cache_ttl:
+            return cached[1]
+
+        # Concurrent questions on a cold cache share a single MCP call
+        with self._schema_lock:
+            cached = self._schema_text_cache
+            if cached is not None and time.monotonic() - cached[0] < self.schema_cache_ttl:
+                return cached[1]
+
+            schema_info = self.get_schema()
+            schema_text = self._render_schema_text(schema_info)
+            # Don't pin an empty schema; the database may be populated later
+            if schema_info.tables:
+                self._schema_text_cache = (time.monotonic(), schema_text)
+            return schema_text
+
+    def invalidate_schema_cache(self) -> None:
+        """Forget the cached schema text so the next call refetches it."""
+        self._schema_text_cache = None
+
+    def _fetch_schema_text(self) -> str:
+        """Retrieve the schema from MCP and render it without caching."""
+        return self._render_schema_text(self.get_schema())
+
+    def _render_schema_text(self, schema_info: SchemaInfo) -> str:
+        """Render SchemaInfo as the English description used in prompts."""
         if not schema_info.tables:
             return "No tables found in database."
 
@@ -181,6 +231,11 @@ class MCPClient:
         """
         Execute a SELECT query via MCP server.
         
+        Results of identical queries are reused for query_cache_ttl seconds.
+        The MCP server is read-only and invoices only change when a new
+        upload is processed, so a short TTL bounds staleness without needing
+        cross-service invalidation.
+        
         Args:
             query: SQL SELECT query to execute
             
@@ -190,6 +245,37 @@ class MCPClient:
         Raises:
             MCPError: If the request fails or query is invalid
         """
+        if self.query_cache_ttl <= 0 or self.query_cache_size <= 0:
+            return self._run_sql_select(query)
+
+        key = query.strip()
+        with self._query_lock:
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                if time.monotonic() - cached[0] < self.query_cache_ttl:
+                    self._query_cache.move_to_end(key)
+                    result = cached[1]
+                    logger.debug("MCP query cache hit")
+                    return QueryResult(rows=list(result.rows), truncated=result.truncated)
+                del self._query_cache[key]
+
+        result = self._run_sql_select(query)
+
+        with self._query_lock:
+            self._query_cache[key] = (time.monotonic(), result)
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+
+        return QueryResult(rows=list(result.rows), truncated=result.truncated)
+
+    def invalidate_query_cache(self) -> None:
+        """Drop all cached query results."""
+        with self._query_lock:
+            self._query_cache.clear()
+
+    def _run_sql_select(self, query: str) -> QueryResult:
+        """Send a SELECT query to the MCP server (uncached)."""
         url = f"{self.base_url}/mcp"
         logger.debug(f"Calling MCP run_sql_select at {url}")
         logger.debug(f"SQL query: {query}")
@@ -263,8 +349,6 @@ class MCPClient:
     
     def _parse_query_result(self, result_text: str) -> list:
         """Parse query result text into rows."""
-        import json
-        
         try:
             # Try to parse as JSON first
             parsed = json.loads(result_text)
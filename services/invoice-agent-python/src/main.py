@@ -12,21 +12,131 @@ The agent uses LangGraph to orchestrate question answering with:
 - Spanish responses for users
 """
 
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, Dict
+
 from fastapi import FastAPI
 from loguru import logger
 
 from .agent.graph import save_to_memory
+from .agent.state import InvoiceAgentState
 from .api.schemas import AskRequest, AskResponse, HealthResponse
 from .config import settings
 from .di import get_graph, get_memory_store
 
+
+async def _periodic_session_cleanup() -> None:
+    """Expire idle sessions on a fixed interval instead of on every request."""
+    interval = max(1, settings.session_cleanup_interval_seconds)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await asyncio.to_thread(
+                get_memory_store().cleanup_expired_sessions,
+                settings.session_ttl_seconds,
+            )
+            if removed:
+                logger.info(f"[Memory] Expired {removed} idle session(s)")
+        except Exception as exc:
+            logger.warning(f"[Memory] Session cleanup failed: {exc}")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Run the session cleanup task for the lifetime of the app."""
+    cleanup_task = None
+    if settings.session_ttl_seconds > 0:
+        cleanup_task = asyncio.create_task(_periodic_session_cleanup())
+    try:
+        yield
+    finally:
+        if cleanup_task is not None:
+            cleanup_task.cancel()
+            try:
+                await cleanup_task
+            except asyncio.CancelledError:
+                pass
+
+
 app = FastAPI(
     title="Invoice Agent Service",
     description="AI agent for Q&A sobre facturas usando LangGraph y Groq",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
+# Graph runs in flight, keyed by session + question, so concurrent duplicate
+# requests (e.g. double submits) share one LLM/MCP round-trip. Only touched
+# from the event loop, so no lock is needed.
+_inflight: Dict[str, "asyncio.Task[AskResponse]"] = {}
+
+
+def _run_graph(session_id: str, question: str) -> AskResponse:
+    """
+    Invoke the graph, store the turn in memory and build the API response.
+
+    Blocking; runs in a worker thread. Only the response fields leave this
+    function, so coalesced waiters don't hold on to the full graph state
+    (schema text, query rows).
+    """
+    graph = get_graph()
+    memory_store = get_memory_store()
+
+    logger.info(f"[Ask] Invoking graph for session {session_id}")
+    initial_state: InvoiceAgentState = {"session_id": session_id, "question": question}
+    final_state: InvoiceAgentState = graph.invoke(initial_state)
+    logger.info(f"[Ask] Graph execution completed for session {session_id}")
+
+    answer = final_state.get("answer")
+    error_code = final_state.get("error_code")
+    logger.debug(f"[Ask] Final state: error_code={error_code}, has_answer={bool(answer)}")
+
+    # Save to memory if successful (has answer and no critical error)
+    if answer:
+        save_to_memory(final_state, memory_store)
+
+    return AskResponse(
+        answer=answer,
+        error_code=error_code,
+        error_message=final_state.get("error_message"),
+    )
+
+
+async def _run_graph_coalesced(session_id: str, question: str) -> AskResponse:
+    """
+    Run the graph off the event loop, joining an identical in-flight run if any.
+
+    The run is a detached task that every caller (the first one included)
+    awaits through asyncio.shield, so a cancelled request never cancels the
+    run the other callers are waiting on. The entry is dropped when the run
+    finishes.
+    """
+    key = hashlib.blake2b(
+        f"{session_id}\0{question}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+    task = _inflight.get(key)
+    if task is not None:
+        logger.info(f"[Ask] Joining in-flight run for session {session_id}")
+    else:
+        task = asyncio.create_task(asyncio.to_thread(_run_graph, session_id, question))
+        _inflight[key] = task
+        task.add_done_callback(partial(_forget_inflight, key))
+    return await asyncio.shield(task)
+
+
+def _forget_inflight(key: str, task: "asyncio.Task[AskResponse]") -> None:
+    """Done callback: drop the finished run from the in-flight table."""
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # Callers re-raise it; don't warn when all were cancelled
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health() -> HealthResponse:
     """
@@ -61,34 +171,8 @@ async def ask(request: AskRequest) -> AskResponse:
     logger.info(f"[Ask] Received question from session {session_id}: {question}")
     
     try:
-        # Get dependencies
-        graph = get_graph()
-        memory_store = get_memory_store()
-        
-        # Create initial state
-        initial_state = {
-            "session_id": session_id,
-            "question": question,
-        }
-        
-        logger.info(f"[Ask] Invoking graph for session {session_id}")
-        
-        # Execute the graph
-        final_state = graph.invoke(initial_state)
-        
-        logger.info(f"[Ask] Graph execution completed for session {session_id}")
-        logger.debug(f"[Ask] Final state: error_code={final_state.get('error_code')}, has_answer={bool(final_state.get('answer'))}")
-        
-        # Save to memory if successful (has answer and no critical error)
-        if final_state.get("answer"):
-            save_to_memory(final_state, memory_store)
-        
-        # Build response
-        response = AskResponse(
-            answer=final_state.get("answer"),
-            error_code=final_state.get("error_code"),
-            error_message=final_state.get("error_message"),
-        )
+        # Execute the graph in a worker thread so the event loop keeps serving
+        response = await _run_graph_coalesced(session_id, question)
         
         logger.info(f"[Ask] Returning response for session {session_id}")
         
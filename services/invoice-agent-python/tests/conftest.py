@@ -0,0 +1,12 @@
+"""Make the service's ``src`` package importable from the tests."""
+
+import os
+import sys
+from pathlib import Path
+
+# Settings are loaded at import time and require an API key; tests never call Groq
+os.environ.setdefault("INVOICE_AGENT_GROQ_API_KEY", "test-key")
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+
+import pytest
+
+from src import main
+from src.api.schemas import AskResponse
+
+
+class BlockingGraph:
+    """Stands in for _run_graph; blocks until released and counts runs."""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.release = threading.Event()
+        self.error = error
+
+    def __call__(self, session_id, question):
+        self.calls.append((session_id, question))
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return AskResponse(answer=f"{session_id}:{question}")
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    fake = BlockingGraph()
+    monkeypatch.setattr(main, "_run_graph", fake)
+    yield fake
+    fake.release.set()
+    assert main._inflight == {}
+
+
+async def _started(graph, count):
+    while len(graph.calls) < count:
+        await asyncio.sleep(0.01)
+
+
+def test_identical_requests_share_one_run(graph):
+    async def scenario():
+        first = asyncio.create_task(main._run_graph_coalesced("s1", "total?"))
+        await _started(graph, 1)
+        second = asyncio.create_task(main._run_graph_coalesced("s1", "total?"))
+        await asyncio.sleep(0.05)
+        graph.release.set()
+        return await asyncio.gather(first, second)
+
+    first, second = asyncio.run(scenario())
+
+    assert len(graph.calls) == 1
+    assert first.answer == second.answer == "s1:total?"
+
+
+def test_different_requests_run_separately(graph):
+    async def scenario():
+        graph.release.set()
+        return await asyncio.gather(
+            main._run_graph_coalesced("s1", "total?"),
+            main._run_graph_coalesced("s2", "total?"),
+            main._run_graph_coalesced("s1", "vendors?"),
+        )
+
+    asyncio.run(scenario())
+
+    assert sorted(graph.calls) == [("s1", "total?"), ("s1", "vendors?"), ("s2", "total?")]
+
+
+def test_cancelled_leader_does_not_cancel_waiters(graph):
+    async def scenario():
+        leader = asyncio.create_task(main._run_graph_coalesced("s1", "total?"))
+        await _started(graph, 1)
+        waiter = asyncio.create_task(main._run_graph_coalesced("s1", "total?"))
+        await asyncio.sleep(0.05)
+
+        leader.cancel()
+        await asyncio.sleep(0.05)
+        graph.release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    response = asyncio.run(scenario())
+
+    assert response.answer == "s1:total?"
+    assert len(graph.calls) == 1
+
+
+def test_errors_reach_every_caller(graph):
+    graph.error = RuntimeError("mcp down")
+
+    async def scenario():
+        first = asyncio.create_task(main._run_graph_coalesced("s1", "total?"))
+        await _started(graph, 1)
+        second = asyncio.create_task(main._run_graph_coalesced("s1", "total?"))
+        await asyncio.sleep(0.05)
+        graph.release.set()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert [str(result) for result in results] == ["mcp down", "mcp down"]
+    assert len(graph.calls) == 1
+
+
+def test_finished_runs_are_not_reused(graph):
+    graph.release.set()
+
+    async def scenario():
+        await main._run_graph_coalesced("s1", "total?")
+        await main._run_graph_coalesced("s1", "total?")
+
+    asyncio.run(scenario())
+
+    assert len(graph.calls) == 2
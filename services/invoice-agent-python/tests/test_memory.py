@@ -0,0 +1,89 @@
+import threading
+
+from src.core.memory import ConversationTurn, MemoryStore
+
+
+def _turn(number: int) -> ConversationTurn:
+    return ConversationTurn(user_question=f"q{number}", assistant_answer=f"a{number}")
+
+
+def test_add_turn_keeps_last_turns():
+    store = MemoryStore(max_turns=3)
+    for number in range(5):
+        store.add_turn("s1", _turn(number))
+
+    assert [turn.user_question for turn in store.get_history("s1")] == ["q2", "q3", "q4"]
+
+
+def test_get_recent_history_bounds_untrimmed_sessions():
+    store = MemoryStore(max_turns=2)
+    for number in range(4):
+        store.append_turn("s1", _turn(number))
+
+    assert [turn.user_question for turn in store.get_recent_history("s1")] == ["q2", "q3"]
+    assert len(store.get_recent_history("s1", max_turns=10)) == 4
+    assert store.get_recent_history("missing") == []
+
+
+def test_history_is_a_snapshot():
+    store = MemoryStore()
+    store.add_turn("s1", _turn(0))
+
+    history = store.get_history("s1")
+    store.add_turn("s1", _turn(1))
+
+    assert len(history) == 1
+
+
+def test_cleanup_expired_sessions():
+    store = MemoryStore()
+    store.add_turn("old", _turn(0))
+    store.add_turn("new", _turn(1))
+    store._last_active["old"] -= 120
+
+    assert store.cleanup_expired_sessions(60) == 1
+    assert store.get_history("old") == []
+    assert len(store.get_history("new")) == 1
+
+
+def test_clear_session_and_clear_all():
+    store = MemoryStore()
+    store.add_turn("s1", _turn(0))
+    store.add_turn("s2", _turn(1))
+
+    store.clear_session("s1")
+    assert store.get_history("s1") == []
+
+    store.clear_all()
+    assert store.get_history("s2") == []
+
+
+def test_concurrent_writers_and_cleanup():
+    store = MemoryStore(max_turns=5)
+    errors = []
+
+    def writer(session_id):
+        try:
+            for number in range(500):
+                store.add_turn(session_id, _turn(number))
+                store.get_recent_history(session_id)
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    def cleaner():
+        try:
+            for _ in range(500):
+                store.cleanup_expired_sessions(0)
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer, args=(f"s{n}",)) for n in range(4)]
+    threads.append(threading.Thread(target=cleaner))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    for n in range(4):
+        assert len(store.get_history(f"s{n}")) <= 5
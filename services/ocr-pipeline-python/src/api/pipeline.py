@@ -9,6 +9,8 @@ Endpoints:
 Features:
 - Concurrency control (semaphore-based)
 - File type validation (PDF, JPG, PNG, BMP)
+- Chunked upload to disk with a size cap (MAX_UPLOAD_BYTES)
+- Duplicate uploads answered from the cache without taking a slot
 - Async file processing
 - Error handling with detailed messages
 
@@ -18,31 +20,73 @@ Supported Formats:
 """
 
 import asyncio
+import hashlib
 import os
 from pathlib import Path
+from typing import BinaryIO
 from uuid import uuid4
 
 from fastapi import APIRouter, File, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
-from src.pipeline.config.settings import UPLOAD_DIR
-from src.pipeline.service.pipeline import run_pipeline
+from src.pipeline.config.settings import MAX_UPLOAD_BYTES, UPLOAD_DIR
+from src.pipeline.service.pipeline import load_cached_result, run_pipeline
 
 router = APIRouter(prefix="/api/pipeline", tags=["pipeline"])
 
 # Concurrency control - prevent overwhelming the LLM API
 _semaphore = asyncio.Semaphore(int(os.getenv("MAX_CONCURRENCY", "1")))
 
+_UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Accepted content types and the extension the upload is stored with
+_ALLOWED_TYPES = {
+    "application/pdf": ".pdf",
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+    "image/bmp": ".bmp",
+}
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES."""
+
+
+def _save_upload(source: BinaryIO, destination: Path, max_bytes: int) -> str:
+    """
+    Copy an upload to disk in fixed-size chunks, hashing it on the way.
+
+    Peak memory stays at one chunk per request instead of the whole file.
+
+    Returns:
+        SHA-256 hex digest of the contents (same as compute_file_hash)
+
+    Raises:
+        UploadTooLarge: If the stream is larger than max_bytes
+    """
+    digest = hashlib.sha256()
+    written = 0
+    with destination.open("wb") as out:
+        while chunk := source.read(_UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if max_bytes > 0 and written > max_bytes:
+                raise UploadTooLarge(written)
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
+
 
 @router.post("/extract")
-async def extract_document(file: UploadFile = File(...)) -> JSONResponse:
+async def extract_document(file: UploadFile = File(...)) -> ORJSONResponse:
     """
     Process an invoice PDF or image and return structured data.
 
     This endpoint:
     1. Validates file type
-    2. Saves uploaded file with unique ID
-    3. Runs OCR + LLM extraction pipeline
+    2. Saves uploaded file with unique ID (hashing it while streaming)
+    3. Returns the cached result for known hashes, otherwise runs the
+       OCR + LLM extraction pipeline
     4. Returns structured JSON (invoice_v1 schema)
     5. Keeps successfully processed files on disk
     
@@ -56,10 +100,11 @@ async def extract_document(file: UploadFile = File(...)) -> JSONResponse:
         file: Uploaded file (multipart/form-data)
         
     Returns:
-        JSONResponse: Structured invoice data
+        ORJSONResponse: Structured invoice data
         
     Raises:
         HTTPException 400: Unsupported file type
+        HTTPException 413: File larger than MAX_UPLOAD_BYTES
         HTTPException 500: Processing error
         
     Example Response:
@@ -73,16 +118,10 @@ async def extract_document(file: UploadFile = File(...)) -> JSONResponse:
         "items": [...]
     }
     """
-    # File type validation
-    allowed_types = {
-        "application/pdf",
-        "image/jpeg",
-        "image/jpg",
-        "image/png",
-        "image/bmp",
-    }
-
-    if file.content_type not in allowed_types:
+    # File type validation (the extension comes from the content type so the
+    # pipeline's PDF/image detection never trusts a mislabeled filename)
+    stored_ext = _ALLOWED_TYPES.get(file.content_type)
+    if stored_ext is None:
         raise HTTPException(
             status_code=400,
             detail=(
@@ -93,30 +132,46 @@ async def extract_document(file: UploadFile = File(...)) -> JSONResponse:
 
     # Generate unique filename and save upload
     file_id = str(uuid4())
-    original_ext = Path(file.filename or "unknown").suffix.lower() or ".pdf"
-    stored_path = UPLOAD_DIR / f"{file_id}{original_ext}"
+    stored_path = UPLOAD_DIR / f"{file_id}{stored_ext}"
     cleanup_file = True
 
     try:
-        # Save file to disk
-        content = await file.read()
-        stored_path.write_bytes(content)
+        # Stream file to disk (blocking I/O runs in a worker thread)
+        file_hash = await asyncio.to_thread(
+            _save_upload, file.file, stored_path, MAX_UPLOAD_BYTES
+        )
+
+        # Duplicate uploads are served from the cache without waiting for a slot
+        result = await asyncio.to_thread(
+            load_cached_result, str(stored_path), file_hash
+        )
 
-        # Run pipeline with concurrency control
-        # This prevents overwhelming the LLM API with parallel requests
-        async with _semaphore:
-            result = await asyncio.to_thread(run_pipeline, str(stored_path))
+        if result is None:
+            # Run pipeline with concurrency control
+            # This prevents overwhelming the LLM API with parallel requests
+            async with _semaphore:
+                # Reuse the digest computed while streaming (no second read)
+                result = await asyncio.to_thread(
+                    run_pipeline, str(stored_path), precomputed_hash=file_hash
+                )
 
-        # Keep successfully processed uploads for debugging/audit
-        cleanup_file = False
+            # Keep successfully processed uploads for debugging/audit
+            # (duplicates served from the cache are removed: the stored
+            # record keeps pointing at the original upload)
+            cleanup_file = False
 
-        return JSONResponse(content=result)
+        return ORJSONResponse(content=result)
 
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size: {MAX_UPLOAD_BYTES} bytes",
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Pipeline execution failed: {str(e)}"
         )
     finally:
-        # Clean up only if processing failed
+        # Clean up if processing failed or the upload was a cached duplicate
         if cleanup_file and stored_path.exists():
             stored_path.unlink()
@@ -2,6 +2,7 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from .api import health, pipeline
 
@@ -15,6 +16,8 @@ def create_app() -> FastAPI:
             "HTTP API that exposes the OCR + LLM pipeline for structured invoice extraction"
         ),
         version="1.0.0",
+        # orjson serializes the large extraction payloads much faster than json
+        default_response_class=ORJSONResponse,
     )
 
     app.add_middleware(
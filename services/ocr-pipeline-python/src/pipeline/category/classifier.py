@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Optional
 
 from .rules import CATEGORY_KEYWORDS, CATEGORY_ORDER, VENDOR_HINTS
@@ -21,9 +22,12 @@ def _normalize(text: str) -> str:
 
 
 def classify_item(description: str, vendor_name: str | None = None) -> Optional[str]:
-    desc_norm = _normalize(description)
-    vendor_norm = _normalize(vendor_name or "")
+    # Results only depend on the normalized strings, so cache on those.
+    return _classify_normalized(_normalize(description), _normalize(vendor_name or ""))
 
+
+@lru_cache(maxsize=4096)
+def _classify_normalized(desc_norm: str, vendor_norm: str) -> Optional[str]:
     # Prioritise vendor-level hints when available.
     for hint, category in VENDOR_HINTS.items():
         if hint in vendor_norm:
@@ -31,10 +35,11 @@ def classify_item(description: str, vendor_name: str | None = None) -> Optional[
 
     best_category = None
     best_hits = 0
+    desc_words = set(desc_norm.split())
 
     for category in CATEGORY_ORDER:
         keywords = CATEGORY_KEYWORDS.get(category, [])
-        hits = sum(1 for k in keywords if k in desc_norm.split())
+        hits = sum(1 for k in keywords if k in desc_words)
         hits += sum(1 for k in keywords if k in desc_norm and len(k.split()) > 1)
         if hits > best_hits:
             best_category = category
@@ -81,6 +81,10 @@ PIPELINE_LLM_ALLOW_STUB = _get_bool_env(
     "PIPELINE_LLM_ALLOW_STUB",
     _get_bool_env("GROQ_ALLOW_STUB", True),
 )
+# Opt-in SSE streaming of chat completions (overlaps generation with receive)
+PIPELINE_LLM_STREAM = _get_bool_env("PIPELINE_LLM_STREAM", False)
+# Send prompt_cache_key so OpenAI-compatible providers can reuse the shared system prefix
+PIPELINE_LLM_PROMPT_CACHE = _get_bool_env("PIPELINE_LLM_PROMPT_CACHE", False)
 
 # Rate Limiter Settings (conservative defaults for free tier)
 # llama-3.3-70b-versatile limits: RPM=30, RPD=14500, TPM=6K, TPD=500K
@@ -89,6 +93,8 @@ RATE_LIMIT_RPM = int(os.getenv("RATE_LIMIT_RPM", "24"))     # 24/30 (80% for saf
 RATE_LIMIT_RPD = int(os.getenv("RATE_LIMIT_RPD", "11500"))  # 11500/14500 (79%)
 RATE_LIMIT_TPM = int(os.getenv("RATE_LIMIT_TPM", "4800"))   # 4800/6000 (80%)
 RATE_LIMIT_TPD = int(os.getenv("RATE_LIMIT_TPD", "400000")) # 400K/500K (80%)
+# Max LLM requests in flight at once (smooths bursts that trigger provider 429s)
+RATE_LIMIT_INFLIGHT = int(os.getenv("RATE_LIMIT_INFLIGHT", "8"))
 
 # Database
 db_url_env = os.getenv("DB_URL")
@@ -107,6 +113,10 @@ DEFAULT_CURRENCY = os.getenv("DEFAULT_CURRENCY", "UNK")
 PDF_OCR_DPI = int(os.getenv("PDF_OCR_DPI", "300"))
 PDF_OCR_MAX_PAGES = int(os.getenv("PDF_OCR_MAX_PAGES", "5"))
 TEXT_MIN_LENGTH = int(os.getenv("TEXT_MIN_LENGTH", "120"))
+# Uploads larger than this are rejected with 413 while streaming to disk
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+# Normalized payloads kept in memory, keyed on LLM response + OCR text hash
+NORMALIZE_CACHE_SIZE = int(os.getenv("NORMALIZE_CACHE_SIZE", "256"))
 
 # Samples path (optional helper for CLI/tests)
 SAMPLES_DIR = Path(os.getenv("SAMPLES_DIR", DATA_ROOT / "samples"))
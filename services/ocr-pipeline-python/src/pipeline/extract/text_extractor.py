@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from itertools import chain
+from typing import List, Optional, Tuple
 import io
 
 import numpy as np
@@ -46,7 +47,12 @@ def extract_pdf_text(path: str, max_pages: int | None = None) -> List[PageText]:
         if part.strip()
     ]
 
-    total_len = sum(len(" ".join(p.lines)) for p in pages)
+    # Same as len(" ".join(p.lines)) per page, without building the strings
+    total_len = (
+        sum(map(len, chain.from_iterable(p.lines for p in pages)))
+        + sum(map(len, (p.lines for p in pages)))
+        - len(pages)
+    )
     if total_len >= 200:
         return pages
 
@@ -93,3 +99,51 @@ def join_pages(pages: List[PageText]) -> str:
     for page in pages:
         sections.append(f"=== Page {page.page} ===\n" + page.join())
     return "\n".join(sections)
+
+
+def materialize_pages(pages: List[PageText]) -> Tuple[str, str, int]:
+    """
+    Build every text view of the pages in a single traversal.
+
+    Returns:
+        (joined, raw_text, total_chars): the page-annotated text from
+        join_pages, all lines joined by newlines, and the number of line
+        characters (newlines excluded)
+    """
+    sections = []
+    bodies = []
+    total_chars = 0
+    for page in pages:
+        body = "\n".join(page.lines)
+        if page.lines:
+            bodies.append(body)
+            total_chars += len(body) - (len(page.lines) - 1)
+        sections.append(f"=== Page {page.page} ===\n" + body)
+    return "\n".join(sections), "\n".join(bodies), total_chars
+
+
+def page_layout(pages: List[PageText]) -> List[Tuple[int, Optional[int]]]:
+    """
+    Describe how raw_text splits into pages, so join_raw_text can rebuild the
+    page-annotated text without storing it.
+
+    Returns:
+        One (page number, body length) pair per page; the length is None for
+        pages without lines, which contribute nothing to raw_text
+    """
+    return [
+        (page.page, len(page.join()) if page.lines else None) for page in pages
+    ]
+
+
+def join_raw_text(raw_text: str, layout: List[Tuple[int, Optional[int]]]) -> str:
+    # Inverse of materialize_pages: re-annotate raw_text using page_layout()
+    sections = []
+    pos = 0
+    for number, length in layout:
+        body = ""
+        if length is not None:
+            body = raw_text[pos : pos + length]
+            pos += length + 1
+        sections.append(f"=== Page {number} ===\n" + body)
+    return "\n".join(sections)
@@ -5,13 +5,14 @@ This module provides LLM client functionality, text parsing utilities,
 and stub response generation for development/testing.
 """
 
-from .groq_client import call_grok, call_groq, call_llm
+from .groq_client import call_grok, call_groq, call_llm, call_llm_multi
 from .stub_generator import generate_stub_response
 from .text_parsers import (
     extract_date,
     extract_invoice_number,
     extract_number,
     find_amount,
+    find_amounts,
     infer_vendor,
     iter_lines,
     to_cents,
@@ -20,6 +21,7 @@ from .text_parsers import (
 __all__ = [
     # Main LLM client
     "call_llm",
+    "call_llm_multi",
     "call_groq",
     "call_grok",
     # Stub generator
@@ -29,6 +31,7 @@ __all__ = [
     "extract_invoice_number",
     "extract_number",
     "find_amount",
+    "find_amounts",
     "infer_vendor",
     "iter_lines",
     "to_cents",
@@ -9,7 +9,8 @@ import json
 import os
 import sys
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 from loguru import logger
@@ -24,10 +25,34 @@ from src.pipeline.config.settings import (
     PIPELINE_LLM_API_BASE,
     PIPELINE_LLM_API_KEY,
     PIPELINE_LLM_MODEL,
+    PIPELINE_LLM_PROMPT_CACHE,
+    PIPELINE_LLM_STREAM,
 )  # noqa: E402
 from src.pipeline.llm.rate_limiter import get_rate_limiter  # noqa: E402
 from src.pipeline.llm.stub_generator import generate_stub_response  # noqa: E402
 
+# Smallest completion budget worth sending when shrinking an oversized request.
+_MIN_COMPLETION_TOKENS = 256
+
+
+class RequestTooLargeError(RuntimeError):
+    """The prompt alone can never fit in the rate limiter token windows."""
+
+
+# Endpoint and auth headers only depend on settings, so build them once at import.
+# Groq exposes an OpenAI-compatible endpoint at /v1/chat/completions.
+_BASE_URL = (PIPELINE_LLM_API_BASE or "https://api.groq.com/openai/v1").rstrip("/")
+_URL = f"{_BASE_URL}/chat/completions"
+# Authorization uses Bearer token (API key)
+_HEADERS = (
+    {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {PIPELINE_LLM_API_KEY}",
+    }
+    if PIPELINE_LLM_API_KEY
+    else None
+)
+
 
 def call_llm(
     messages: List[Dict],
@@ -35,6 +60,8 @@ def call_llm(
     max_tokens: int = 4096,
     usage_tag: str = "pipeline",
     allow_repair: bool = True,
+    stream: Optional[bool] = None,
+    prompt_cache_key: Optional[str] = None,
 ) -> str:
     """
     Call the Groq chat completion endpoint used by the pipeline.
@@ -51,6 +78,9 @@ def call_llm(
         temperature: Controls randomness (0.0 = deterministic, 1.0 = creative)
         max_tokens: Maximum tokens in the response (not including prompt)
         usage_tag: Label for tracking usage in rate limiter metrics
+        stream: Receive the completion as SSE chunks (defaults to PIPELINE_LLM_STREAM)
+        prompt_cache_key: Identifier of a shared prompt prefix (sent only when
+            PIPELINE_LLM_PROMPT_CACHE is enabled)
 
     Returns:
         Raw JSON string response from the model
@@ -58,6 +88,7 @@ def call_llm(
     Raises:
         ValueError: If API key is missing and stub mode is disabled
         RuntimeError: If all retry attempts fail or rate limits are exceeded
+        RequestTooLargeError: If the prompt can never fit in the limiter windows
     """
     # STEP 1: Check if API key is configured
     # If missing, either return a stub (for development) or raise an error
@@ -74,20 +105,42 @@ def call_llm(
     # STEP 3: Estimate total tokens needed for this request
     # Groq charges based on both prompt tokens (input) and completion tokens (output)
     # We approximate: prompt_tokens ≈ text_length / 4 (rough heuristic)
-    prompt_text = json.dumps(messages, ensure_ascii=False)
-    estimated_tokens = max_tokens + max(1, len(prompt_text) // 4)
-
-    # STEP 4: Build the HTTP request components
-    # Groq exposes an OpenAI-compatible endpoint at /v1/chat/completions
-    base_url = (PIPELINE_LLM_API_BASE or "https://api.groq.com/openai/v1").rstrip("/")
-    url = f"{base_url}/chat/completions"
+    # Measure message contents directly instead of serializing the whole payload;
+    # 32 chars per message cover the role/JSON framing overhead.
+    char_count = sum(len(m.get("content") or "") for m in messages) + 32 * len(messages)
+    estimated_tokens = max_tokens + max(1, char_count // 4)
+
+    # STEP 3b: Make sure the request can ever fit in the limiter windows
+    # Shrink the completion budget once; if the prompt alone is too large,
+    # degrade to the stub (when allowed) instead of waiting forever.
+    if rate_limiter and estimated_tokens > rate_limiter.max_request_tokens:
+        prompt_estimate = estimated_tokens - max_tokens
+        shrunk_tokens = rate_limiter.max_request_tokens - prompt_estimate
+        if shrunk_tokens >= _MIN_COMPLETION_TOKENS:
+            logger.warning(
+                "Request needs ~{needed} tokens but limiter capacity is {cap}; "
+                "shrinking max_tokens {old} -> {new}",
+                needed=estimated_tokens,
+                cap=rate_limiter.max_request_tokens,
+                old=max_tokens,
+                new=shrunk_tokens,
+            )
+            max_tokens = shrunk_tokens
+            estimated_tokens = prompt_estimate + max_tokens
+        elif PIPELINE_LLM_ALLOW_STUB:
+            logger.warning(
+                "Prompt (~{prompt} tokens) exceeds limiter capacity {cap}; returning stub response",
+                prompt=prompt_estimate,
+                cap=rate_limiter.max_request_tokens,
+            )
+            return generate_stub_response(messages)
+        else:
+            raise RequestTooLargeError(
+                f"Prompt (~{prompt_estimate} tokens) exceeds rate limiter capacity "
+                f"({rate_limiter.max_request_tokens} tokens)"
+            )
 
-    # STEP 5: Set up authentication and content headers
-    # Authorization uses Bearer token (API key)
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {PIPELINE_LLM_API_KEY}",
-    }
+    # STEP 4-5: URL and auth headers are precomputed at import (_URL / _HEADERS)
 
     # STEP 6: Construct request body following OpenAI spec
     body = {
@@ -106,6 +159,12 @@ def call_llm(
         # Model MUST return valid JSON or request fails
         "response_format": {"type": "json_object"},
     }
+    if PIPELINE_LLM_PROMPT_CACHE and prompt_cache_key:
+        # Routes requests sharing the system prompt to the same prefix cache
+        body["prompt_cache_key"] = prompt_cache_key
+    use_stream = PIPELINE_LLM_STREAM if stream is None else stream
+    if use_stream:
+        body["stream"] = True
 
     # STEP 7: Retry loop with exponential backoff
     # We attempt up to 4 times to handle transient failures (network issues, rate limits, server errors)
@@ -126,15 +185,22 @@ def call_llm(
                 "Calling Groq chat API (attempt {attempt})",
                 attempt=attempt + 1,
             )
-            response = requests.post(url, headers=headers, json=body, timeout=60)
+            response = requests.post(
+                _URL, headers=_HEADERS, json=body, timeout=60, stream=use_stream
+            )
 
             # STEP 8: Handle successful response (HTTP 200)
             if response.status_code == 200:
-                data = response.json()
-
-                # Extract the generated text from the first choice
-                # OpenAI format: {choices: [{message: {role, content}}]}
-                content = data["choices"][0]["message"]["content"]
+                if use_stream:
+                    # Deltas are joined as they arrive; usage comes in the last chunk
+                    content, usage = _read_stream(response)
+                else:
+                    data = response.json()
+
+                    # Extract the generated text from the first choice
+                    # OpenAI format: {choices: [{message: {role, content}}]}
+                    content = data["choices"][0]["message"]["content"]
+                    usage = data.get("usage") or {}
                 logger.debug(
                     "Groq response received: {chars} chars",
                     chars=len(content),
@@ -142,7 +208,6 @@ def call_llm(
 
                 # STEP 8a: Extract actual token usage from response
                 # Groq returns real token counts (more accurate than our estimate)
-                usage = data.get("usage") or {}
                 prompt_tokens = usage.get("prompt_tokens")
                 completion_tokens = usage.get("completion_tokens", 0)
 
@@ -162,6 +227,14 @@ def call_llm(
                 # Success! Return the JSON content
                 return content
 
+            # STEP 8c: Release streamed error responses
+            # Their body is never iterated, so load it (error bodies are small and
+            # still readable below) and hand the connection back to the pool
+            # before retrying or raising
+            if use_stream:
+                response.content  # noqa: B018
+                response.close()
+
             # STEP 9: Handle rate limit errors (HTTP 429)
             # This means we've exceeded Groq's quotas (requests per minute, tokens per day, etc.)
             if response.status_code == 429:
@@ -287,6 +360,11 @@ def call_llm(
                 continue
             raise  # Re-raise on final attempt
 
+        finally:
+            # Free the in-flight slot whatever the outcome (no-op if already cancelled)
+            if rate_limiter and entry_id is not None:
+                rate_limiter.release_inflight(entry_id)
+
         # STEP 14: Clean up if request failed but didn't raise an exception
         # This shouldn't happen in normal flow, but ensures rate limiter cleanup
         if rate_limiter and entry_id is not None:
@@ -312,6 +390,54 @@ def call_llm(
     raise RuntimeError("Groq API call failed after all retries")
 
 
+def call_llm_multi(
+    prompts: List[List[Dict]],
+    temperature: float = 0.0,
+    max_tokens: int = 4096,
+    usage_tag: str = "pipeline",
+) -> List[str]:
+    """
+    Run several independent chat completions concurrently.
+
+    Groq's chat endpoint takes one conversation per request, so the prompts are
+    dispatched through a small thread pool instead of being packed together.
+    Each call still goes through ``call_llm`` (rate limiter admission, retries,
+    stub fallback); the pool is sized to half the RPM budget and never wider
+    than the limiter's in-flight cap.
+
+    Args:
+        prompts: One message list per completion
+        temperature: Sampling temperature shared by all calls
+        max_tokens: Completion budget per call
+        usage_tag: Label for tracking usage in rate limiter metrics
+
+    Returns:
+        Raw responses in the same order as ``prompts``
+    """
+    if not prompts:
+        return []
+
+    def _call(messages: List[Dict]) -> str:
+        return call_llm(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            usage_tag=usage_tag,
+        )
+
+    if len(prompts) == 1:
+        return [_call(prompts[0])]
+
+    rate_limiter = get_rate_limiter()
+    workers = min(
+        len(prompts),
+        max(1, rate_limiter.rpm_limit // 2),
+        rate_limiter.inflight_limit,
+    )
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm") as pool:
+        return list(pool.map(_call, prompts))
+
+
 # Backward compatibility aliases for legacy code
 call_groq = call_llm  # Old name (typo-safe)
 call_grok = call_llm  # Alternative spelling
@@ -386,6 +512,28 @@ def _attempt_failed_generation_repair(
         return None
 
 
+def _read_stream(response: requests.Response) -> Tuple[str, Dict[str, Any]]:
+    """Collect an SSE chat completion into (content, usage)."""
+    parts: List[str] = []
+    usage: Dict[str, Any] = {}
+    for line in response.iter_lines(chunk_size=None):
+        if not line.startswith(b"data: "):
+            continue
+        data = line[6:].strip()
+        if data == b"[DONE]":
+            break
+        chunk = json.loads(data)
+        for choice in chunk.get("choices") or []:
+            delta = choice.get("delta") or {}
+            if delta.get("content"):
+                parts.append(delta["content"])
+        # OpenAI reports usage at the top level, Groq under x_groq
+        chunk_usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+        if chunk_usage:
+            usage = chunk_usage
+    return "".join(parts), usage
+
+
 def _strip_code_fence(payload: str) -> str:
     candidate = payload.strip()
     if candidate.startswith("```"):
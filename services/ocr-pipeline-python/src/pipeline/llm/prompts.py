@@ -20,8 +20,9 @@ Key Design Decisions:
 
 from __future__ import annotations
 
+import hashlib
 import json
-from typing import Dict
+from typing import Dict, List
 
 # ============================================================================
 # SCHEMA DEFINITION
@@ -65,6 +66,102 @@ CATEGORIES = (
 )
 
 
+# Extraction rules shared by the single-document and batch user prompts
+_EXTRACTION_GUIDELINES = (
+    "- Amounts in cents (integers).\n"
+    "- **CRITICAL - Number format handling (READ CAREFULLY)**:\n"
+    "  * European format uses COMMA as decimal separator: '49,99' = $49.99 = 4999 cents\n"
+    "  * SPACE or DOT are thousand separators (IGNORE THEM): '1 054,10' = $1,054.10 = 105410 cents\n"
+    "  * Examples:\n"
+    "    - '49,99' → 4999 cents (forty-nine dollars, ninety-nine cents)\n"
+    "    - '177,08' → 17708 cents (one hundred seventy-seven dollars, eight cents)\n"
+    "    - '958,27' → 95827 cents (nine hundred fifty-eight dollars, twenty-seven cents)\n"
+    "    - '1 054,10' → 105410 cents (one thousand fifty-four dollars, ten cents)\n"
+    "    - '274,95' → 27495 cents (two hundred seventy-four dollars, ninety-five cents)\n"
+    "    - '779,15' → 77915 cents (seven hundred seventy-nine dollars, fifteen cents)\n"
+    "  * NEVER multiply by 100 after reading the comma! The last 2 digits after comma are ALREADY cents.\n"
+    "  * NEVER include thousand separators in your output - remove all spaces and dots from numbers.\n"
+    "- **CRITICAL - Use correct totals**: For line items, ALWAYS use 'Gross worth' (total INCLUDING tax/VAT), NOT 'Net worth'. "
+    "If you see both 'Net worth' and 'Gross worth' columns, use 'Gross worth' for line_total_cents.\n"
+    "- **CRITICAL - Summary section mapping (VERY IMPORTANT)**:\n"
+    "  * 'Net worth' in summary = invoice.subtotal_cents (amount BEFORE tax)\n"
+    "  * 'VAT' in summary = invoice.tax_cents (tax amount)\n"
+    "  * 'Gross worth' in summary = invoice.total_cents (amount AFTER tax, includes tax)\n"
+    "  * Formula: Gross worth = Net worth + VAT → total_cents = subtotal_cents + tax_cents\n"
+    "  * Example: If summary shows 'Net worth: $958.27, VAT: $95.83, Gross worth: $1,054.10' then:\n"
+    "    subtotal_cents = 95827, tax_cents = 9583, total_cents = 105410\n"
+    "- **CRITICAL - Shipping vs Tax handling**:\n"
+    "  * Some invoices show 'Shipping' or 'Shipping & Handling' instead of 'Tax' or 'VAT'\n"
+    "  * Shipping fees should go in tax_cents field (we use it for all additional charges)\n"
+    "  * Example: 'Subtotal: $1,292.76, Discount (20%): $258.55, Shipping: $16.43, Total: $1,050.64'\n"
+    "    - subtotal_cents = 129276\n"
+    "    - tax_cents = 1643 (shipping fee)\n"
+    "    - discount_cents = 25855\n"
+    "    - total_cents = 105064\n"
+    "  * Formula: total = subtotal + tax - discount\n"
+    "  * Verify: 1292.76 + 16.43 - 258.55 = 1050.64 ✓\n"
+    "- **CRITICAL - Item table column mapping**:\n"
+    "  * If you see BOTH 'Net price' and 'Gross worth' columns in items table:\n"
+    "    - items[].unit_price_cents = use 'Net price' column (unit price BEFORE tax)\n"
+    "    - items[].line_total_cents = use 'Gross worth' column (line total AFTER tax)\n"
+    "  * Apply the European decimal format rules to BOTH columns:\n"
+    "    - 'Net price: 49,99' → unit_price_cents = 4999 (NOT 27495 from Gross worth)\n"
+    "    - 'Gross worth: 274,95' → line_total_cents = 27495\n"
+    "  * NEVER use 'Gross worth' for unit_price_cents - always use 'Net price' if available!\n"
+    "- Missing qty → 1.0, missing unit_price → null, line_total_cents is required.\n"
+    "- Detect currency from symbols/text, otherwise 'UNK'.\n"
+    "- Dates in YYYY-MM-DD. Resolve ambiguous dates via month ≤ 12.\n"
+    "- Use exactly one allowed category per item (fallback 'Other').\n"
+    "- Only compare sum(items.line_total_cents) against invoice.subtotal_cents (or invoice.total_cents if subtotal is null). "
+    "Do NOT warn when invoice.total_cents = subtotal_cents + tax_cents - discount_cents.\n"
+    "- Always include invoice.discount_cents (0 if there is no discount).\n"
+    "- ALL amounts in cents must be literal integers (no formulas, multiplications, or strings with symbols).\n"
+    "- Some invoices list a descriptive line right below the item (category, SKU, etc.). "
+    "If that line does NOT have quantity/price/amounts, concatenate it to the previous item instead of creating a new item."
+)
+
+
+# Rules shared by the single and batched system prompts
+_SYSTEM_RULES = (
+    "Do not hallucinate values: "
+    "if a field is missing, use null (or documented defaults). Convert all monetary amounts "
+    "to cents (INTEGER). Detect the currency from symbols or text; when unsure, use 'UNK'. "
+    "Categorize each line item using exactly one category from the provided list; if nothing fits, use 'Other'. "
+    "Ensure sum(items.line_total_cents) matches invoice.subtotal_cents when available "
+    "(or invoice.total_cents if subtotal is missing). Only warn when the relevant target differs "
+    "by more than ~1%, and never warn solely because total_cents includes tax on top of subtotal. "
+    "Capture discounts explicitly in invoice.discount_cents (0 when no discount) so that "
+    "total_cents = subtotal_cents + tax_cents - discount_cents. "
+    "Absolutely never emit arithmetic expressions (e.g., '322639 * 0.15'); every numeric field MUST be a literal integer."
+)
+
+# The system prompt never varies per document: build it once so every request
+# shares a byte-identical prefix (lets the provider reuse its prompt cache).
+SYSTEM_PROMPT = (
+    "You are an expert invoice extractor. Return ONLY valid JSON that exactly matches the "
+    "'invoice_v1' schema. Do not add any text outside the JSON. " + _SYSTEM_RULES
+)
+
+# Batched requests answer with several invoices wrapped in {"documents": [...]}
+BATCH_SYSTEM_PROMPT = (
+    "You are an expert invoice extractor. The user message contains several invoices. "
+    'Return ONLY one valid JSON object {"documents": [...]} holding one entry per '
+    "invoice; each entry exactly matches the 'invoice_v1' schema plus a \"doc\" field with "
+    "the document number. Do not add any text outside the JSON. " + _SYSTEM_RULES
+)
+
+# Stable identifiers of the shared prefixes, sent as prompt_cache_key when enabled
+SYSTEM_PROMPT_CACHE_KEY = hashlib.blake2b(
+    SYSTEM_PROMPT.encode("utf-8"), digest_size=8
+).hexdigest()
+BATCH_SYSTEM_PROMPT_CACHE_KEY = hashlib.blake2b(
+    BATCH_SYSTEM_PROMPT.encode("utf-8"), digest_size=8
+).hexdigest()
+
+# Compact schema example embedded in every user prompt
+_SCHEMA_TEXT = json.dumps(SCHEMA_SNIPPET, ensure_ascii=False, separators=(",", ":"))
+
+
 # ============================================================================
 # PROMPT BUILDERS
 # ============================================================================
@@ -85,19 +182,7 @@ def build_system_prompt() -> str:
     Returns:
         str: System prompt for LLM
     """
-    return (
-        "You are an expert invoice extractor. Return ONLY valid JSON that exactly matches the "
-        "'invoice_v1' schema. Do not add any text outside the JSON. Do not hallucinate values: "
-        "if a field is missing, use null (or documented defaults). Convert all monetary amounts "
-        "to cents (INTEGER). Detect the currency from symbols or text; when unsure, use 'UNK'. "
-        "Categorize each line item using exactly one category from the provided list; if nothing fits, use 'Other'. "
-        "Ensure sum(items.line_total_cents) matches invoice.subtotal_cents when available "
-        "(or invoice.total_cents if subtotal is missing). Only warn when the relevant target differs "
-        "by more than ~1%, and never warn solely because total_cents includes tax on top of subtotal. "
-        "Capture discounts explicitly in invoice.discount_cents (0 when no discount) so that "
-        "total_cents = subtotal_cents + tax_cents - discount_cents. "
-        "Absolutely never emit arithmetic expressions (e.g., '322639 * 0.15'); every numeric field MUST be a literal integer."
-    )
+    return SYSTEM_PROMPT
 
 
 def build_user_prompt(page_text: str) -> str:
@@ -120,7 +205,6 @@ def build_user_prompt(page_text: str) -> str:
     Returns:
         str: User prompt for LLM
     """
-    schema_text = json.dumps(SCHEMA_SNIPPET, ensure_ascii=False, separators=(",", ":"))
     return (
         "Extract the structured invoice from the following document text.\n"
         "Do not output anything except the JSON payload.\n\n"
@@ -129,59 +213,10 @@ def build_user_prompt(page_text: str) -> str:
         "### Valid categories\n"
         f"{CATEGORIES}.\n\n"
         "### Schema (compact JSON)\n"
-        f"{schema_text}\n\n"
+        f"{_SCHEMA_TEXT}\n\n"
         "### Guidelines\n"
         "- Return one JSON object matching 'invoice_v1'.\n"
-        "- Amounts in cents (integers).\n"
-        "- **CRITICAL - Number format handling (READ CAREFULLY)**:\n"
-        "  * European format uses COMMA as decimal separator: '49,99' = $49.99 = 4999 cents\n"
-        "  * SPACE or DOT are thousand separators (IGNORE THEM): '1 054,10' = $1,054.10 = 105410 cents\n"
-        "  * Examples:\n"
-        "    - '49,99' → 4999 cents (forty-nine dollars, ninety-nine cents)\n"
-        "    - '177,08' → 17708 cents (one hundred seventy-seven dollars, eight cents)\n"
-        "    - '958,27' → 95827 cents (nine hundred fifty-eight dollars, twenty-seven cents)\n"
-        "    - '1 054,10' → 105410 cents (one thousand fifty-four dollars, ten cents)\n"
-        "    - '274,95' → 27495 cents (two hundred seventy-four dollars, ninety-five cents)\n"
-        "    - '779,15' → 77915 cents (seven hundred seventy-nine dollars, fifteen cents)\n"
-        "  * NEVER multiply by 100 after reading the comma! The last 2 digits after comma are ALREADY cents.\n"
-        "  * NEVER include thousand separators in your output - remove all spaces and dots from numbers.\n"
-        "- **CRITICAL - Use correct totals**: For line items, ALWAYS use 'Gross worth' (total INCLUDING tax/VAT), NOT 'Net worth'. "
-        "If you see both 'Net worth' and 'Gross worth' columns, use 'Gross worth' for line_total_cents.\n"
-        "- **CRITICAL - Summary section mapping (VERY IMPORTANT)**:\n"
-        "  * 'Net worth' in summary = invoice.subtotal_cents (amount BEFORE tax)\n"
-        "  * 'VAT' in summary = invoice.tax_cents (tax amount)\n"
-        "  * 'Gross worth' in summary = invoice.total_cents (amount AFTER tax, includes tax)\n"
-        "  * Formula: Gross worth = Net worth + VAT → total_cents = subtotal_cents + tax_cents\n"
-        "  * Example: If summary shows 'Net worth: $958.27, VAT: $95.83, Gross worth: $1,054.10' then:\n"
-        "    subtotal_cents = 95827, tax_cents = 9583, total_cents = 105410\n"
-        "- **CRITICAL - Shipping vs Tax handling**:\n"
-        "  * Some invoices show 'Shipping' or 'Shipping & Handling' instead of 'Tax' or 'VAT'\n"
-        "  * Shipping fees should go in tax_cents field (we use it for all additional charges)\n"
-        "  * Example: 'Subtotal: $1,292.76, Discount (20%): $258.55, Shipping: $16.43, Total: $1,050.64'\n"
-        "    - subtotal_cents = 129276\n"
-        "    - tax_cents = 1643 (shipping fee)\n"
-        "    - discount_cents = 25855\n"
-        "    - total_cents = 105064\n"
-        "  * Formula: total = subtotal + tax - discount\n"
-        "  * Verify: 1292.76 + 16.43 - 258.55 = 1050.64 ✓\n"
-        "- **CRITICAL - Item table column mapping**:\n"
-        "  * If you see BOTH 'Net price' and 'Gross worth' columns in items table:\n"
-        "    - items[].unit_price_cents = use 'Net price' column (unit price BEFORE tax)\n"
-        "    - items[].line_total_cents = use 'Gross worth' column (line total AFTER tax)\n"
-        "  * Apply the European decimal format rules to BOTH columns:\n"
-        "    - 'Net price: 49,99' → unit_price_cents = 4999 (NOT 27495 from Gross worth)\n"
-        "    - 'Gross worth: 274,95' → line_total_cents = 27495\n"
-        "  * NEVER use 'Gross worth' for unit_price_cents - always use 'Net price' if available!\n"
-        "- Missing qty → 1.0, missing unit_price → null, line_total_cents is required.\n"
-        "- Detect currency from symbols/text, otherwise 'UNK'.\n"
-        "- Dates in YYYY-MM-DD. Resolve ambiguous dates via month ≤ 12.\n"
-        "- Use exactly one allowed category per item (fallback 'Other').\n"
-        "- Only compare sum(items.line_total_cents) against invoice.subtotal_cents (or invoice.total_cents if subtotal is null). "
-        "Do NOT warn when invoice.total_cents = subtotal_cents + tax_cents - discount_cents.\n"
-        "- Always include invoice.discount_cents (0 if there is no discount).\n"
-        "- ALL amounts in cents must be literal integers (no formulas, multiplications, or strings with symbols).\n"
-        "- Some invoices list a descriptive line right below the item (category, SKU, etc.). "
-        "If that line does NOT have quantity/price/amounts, concatenate it to the previous item instead of creating a new item."
+        f"{_EXTRACTION_GUIDELINES}"
     )
 
 
@@ -198,6 +233,52 @@ def build_messages(page_text: str) -> Dict[str, str]:
     Returns:
         dict: {"system": str, "user": str} messages
     """
-    system = build_system_prompt()
-    user = build_user_prompt(page_text)
-    return {"system": system, "user": user}
+    return {"system": SYSTEM_PROMPT, "user": build_user_prompt(page_text)}
+
+
+def build_batch_user_prompt(page_texts: List[str]) -> str:
+    """
+    Build a user message that asks for several invoices in one completion.
+
+    Each document is wrapped in <<DOC n>> ... <<END n>> markers (1-based) and
+    the model must answer with {"documents": [{"doc": n, ...invoice_v1...}]}.
+    JSON mode only accepts objects, so the array is nested under "documents".
+
+    Args:
+        page_texts: OCR extracted text, one entry per invoice
+
+    Returns:
+        str: User prompt for LLM
+    """
+    documents = "\n\n".join(
+        f"<<DOC {number}>>\n{text}\n<<END {number}>>"
+        for number, text in enumerate(page_texts, start=1)
+    )
+    return (
+        f"Extract the structured invoice from each of the {len(page_texts)} documents below.\n"
+        "Do not output anything except the JSON payload.\n\n"
+        "### Documents\n"
+        f"{documents}\n\n"
+        "### Valid categories\n"
+        f"{CATEGORIES}.\n\n"
+        "### Schema (compact JSON, one per document)\n"
+        f"{_SCHEMA_TEXT}\n\n"
+        "### Guidelines\n"
+        '- Return one JSON object {"documents": [...]} with exactly one entry per document, '
+        'in order. Each entry is an \'invoice_v1\' object plus "doc": <document number>.\n'
+        "- Never mix data between documents; each entry only uses text between its own markers.\n"
+        f"{_EXTRACTION_GUIDELINES}"
+    )
+
+
+def build_batch_messages(page_texts: List[str]) -> Dict[str, str]:
+    """
+    Build chat messages for a batched extraction sharing one system prompt.
+
+    Args:
+        page_texts: OCR extracted text, one entry per invoice
+
+    Returns:
+        dict: {"system": str, "user": str} messages
+    """
+    return {"system": BATCH_SYSTEM_PROMPT, "user": build_batch_user_prompt(page_texts)}
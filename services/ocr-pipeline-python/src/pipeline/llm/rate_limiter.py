@@ -10,11 +10,10 @@ Reference limits (Groq llama-3.1-8b-instant free tier):
 
 import os
 import sys
-import time
 from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from threading import Lock
+from threading import BoundedSemaphore, Condition, Lock
 from typing import Any, Optional
 
 from loguru import logger
@@ -25,12 +24,16 @@ if default_root not in sys.path:
     sys.path.insert(0, default_root)
 
 from src.pipeline.config.settings import (  # noqa: E402
+    RATE_LIMIT_INFLIGHT,
     RATE_LIMIT_RPD,
     RATE_LIMIT_RPM,
     RATE_LIMIT_TPD,
     RATE_LIMIT_TPM,
 )
 
+# Quota windows tracked by the limiter, in reporting order
+_WINDOW_KEYS = ("rpm", "rpd", "tpm", "tpd")
+
 
 class LLMRateLimiter:
     """Thread-safe rate limiter with token accounting per workload."""
@@ -41,11 +44,15 @@ class LLMRateLimiter:
         rpd_limit: int | None = None,
         tpm_limit: int | None = None,
         tpd_limit: int | None = None,
+        inflight_limit: int | None = None,
     ) -> None:
         self.rpm_limit = rpm_limit if rpm_limit is not None else RATE_LIMIT_RPM
         self.rpd_limit = rpd_limit if rpd_limit is not None else RATE_LIMIT_RPD
         self.tpm_limit = tpm_limit if tpm_limit is not None else RATE_LIMIT_TPM
         self.tpd_limit = tpd_limit if tpd_limit is not None else RATE_LIMIT_TPD
+        self.inflight_limit = max(
+            1, inflight_limit if inflight_limit is not None else RATE_LIMIT_INFLIGHT
+        )
 
         self.minute_requests: deque[dict[str, Any]] = deque()
         self.day_requests: deque[dict[str, Any]] = deque()
@@ -54,6 +61,14 @@ class LLMRateLimiter:
         self._usage_breakdown: dict[str, dict[str, int]] = {}
 
         self.lock = Lock()
+        # Waiters sleep on this condition (releasing the lock) so other threads
+        # can record usage or cancel reservations while someone is backing off.
+        self._capacity_freed = Condition(self.lock)
+
+        # Caps concurrent in-flight calls; admitted entries hold a slot until
+        # release_inflight()/cancel_request() (tracked by id to avoid double release).
+        self._inflight = BoundedSemaphore(self.inflight_limit)
+        self._inflight_entries: set[int] = set()
 
         logger.info(
             "Rate limiter initialized: RPM={rpm}/{rpm_max}, RPD={rpd}/{rpd_max}, "
@@ -73,12 +88,18 @@ class LLMRateLimiter:
         minute_ago = now - timedelta(minutes=1)
         day_ago = now - timedelta(days=1)
 
+        freed = False
         while self.minute_requests and self.minute_requests[0]["timestamp"] < minute_ago:
             self.minute_requests.popleft()
+            freed = True
 
         while self.day_requests and self.day_requests[0]["timestamp"] < day_ago:
             expired = self.day_requests.popleft()
             self._entries.pop(expired["id"], None)
+            freed = True
+
+        if freed:
+            self._capacity_freed.notify_all()
 
     def _current_usage(self) -> dict[str, int]:
         self._cleanup_old_entries()
@@ -90,7 +111,36 @@ class LLMRateLimiter:
 
         return {"rpm": rpm_current, "rpd": rpd_current, "tpm": tpm_current, "tpd": tpd_current}
 
+    def _limits(self) -> dict[str, int]:
+        return {
+            "rpm": self.rpm_limit,
+            "rpd": self.rpd_limit,
+            "tpm": self.tpm_limit,
+            "tpd": self.tpd_limit,
+        }
+
+    @property
+    def max_request_tokens(self) -> int:
+        """Largest single reservation that can ever fit in the token windows."""
+        return min(self.tpm_limit, self.tpd_limit)
+
     def check_and_wait(self, estimated_tokens: int = 1000, tag: str = "generic") -> dict[str, Any]:
+        # A request larger than a whole window can never be admitted; fail fast
+        # instead of waiting forever.
+        if estimated_tokens > self.max_request_tokens:
+            raise ValueError(
+                f"estimated_tokens={estimated_tokens} exceeds bucket capacity "
+                f"(tpm={self.tpm_limit}, tpd={self.tpd_limit})"
+            )
+
+        self._inflight.acquire()
+        try:
+            return self._admit(estimated_tokens, tag)
+        except BaseException:
+            self._inflight.release()
+            raise
+
+    def _admit(self, estimated_tokens: int, tag: str) -> dict[str, Any]:
         with self.lock:
             while True:
                 usage = self._current_usage()
@@ -114,6 +164,7 @@ class LLMRateLimiter:
                     self.minute_requests.append(entry)
                     self.day_requests.append(entry)
                     self._entries[entry_id] = entry
+                    self._inflight_entries.add(entry_id)
 
                     stats = self._usage_breakdown.setdefault(
                         tag,
@@ -137,12 +188,7 @@ class LLMRateLimiter:
                     return {
                         "wait_time": 0,
                         "usage": usage,
-                        "limits": {
-                            "rpm": self.rpm_limit,
-                            "rpd": self.rpd_limit,
-                            "tpm": self.tpm_limit,
-                            "tpd": self.tpd_limit,
-                        },
+                        "limits": self._limits(),
                         "entry_id": entry_id,
                         "estimated_tokens": estimated_tokens,
                     }
@@ -180,7 +226,8 @@ class LLMRateLimiter:
                     wait=wait_time,
                 )
 
-                time.sleep(wait_time)
+                # Releases the lock while waiting; woken early when capacity frees up.
+                self._capacity_freed.wait(timeout=wait_time)
 
     def record_actual_tokens(
         self,
@@ -195,6 +242,8 @@ class LLMRateLimiter:
                 logger.debug("Rate limiter entry {entry} not found", entry=entry_id)
                 return
 
+            if total < entry["tokens"]:
+                self._capacity_freed.notify_all()
             entry["tokens"] = total
             entry["prompt_tokens"] = prompt_tokens
             entry["completion_tokens"] = completion_tokens
@@ -207,7 +256,16 @@ class LLMRateLimiter:
             stats["prompt_tokens"] += prompt_tokens
             stats["completion_tokens"] += completion_tokens
 
+    def release_inflight(self, entry_id: int) -> None:
+        """Free the in-flight slot held by an admitted request (idempotent)."""
+        with self.lock:
+            if entry_id not in self._inflight_entries:
+                return
+            self._inflight_entries.discard(entry_id)
+        self._inflight.release()
+
     def cancel_request(self, entry_id: int) -> None:
+        self.release_inflight(entry_id)
         with self.lock:
             entry = self._entries.pop(entry_id, None)
             if not entry:
@@ -225,6 +283,7 @@ class LLMRateLimiter:
             self.day_requests = deque(
                 item for item in self.day_requests if item["id"] != entry_id
             )
+            self._capacity_freed.notify_all()
 
     def retag_entry(self, entry_id: int, new_tag: str) -> None:
         """Reassign a reservation to a different workload tag."""
@@ -263,19 +322,13 @@ class LLMRateLimiter:
                 for tag, data in self._usage_breakdown.items()
             }
 
+            limits = self._limits()
+
             return {
                 "usage": usage,
-                "limits": {
-                    "rpm": self.rpm_limit,
-                    "rpd": self.rpd_limit,
-                    "tpm": self.tpm_limit,
-                    "tpd": self.tpd_limit,
-                },
+                "limits": limits,
                 "remaining": {
-                    "rpm": max(0, self.rpm_limit - usage["rpm"]),
-                    "rpd": max(0, self.rpd_limit - usage["rpd"]),
-                    "tpm": max(0, self.tpm_limit - usage["tpm"]),
-                    "tpd": max(0, self.tpd_limit - usage["tpd"]),
+                    key: max(0, limits[key] - usage[key]) for key in _WINDOW_KEYS
                 },
                 "breakdown": breakdown,
             }
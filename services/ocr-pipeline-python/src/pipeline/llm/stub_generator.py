@@ -6,18 +6,44 @@ useful for development and testing without consuming API credits.
 """
 
 import json
-from decimal import Decimal
 from typing import Dict, List
 
 from .text_parsers import (
     extract_date,
     extract_invoice_number,
-    find_amount,
+    find_amounts,
     infer_vendor,
     to_cents,
 )
 
 
+# Fixed parts of the stub payload. Only the leaves derived from the prompt
+# change per call, so they are merged over these shallow templates.
+_STUB_INVOICE_DEFAULTS = {
+    "vendor_tax_id": None,
+    "buyer_name": None,
+    "currency_code": "UNK",
+}
+
+_STUB_ITEM_DEFAULTS = {
+    "idx": 1,
+    "description": "Total invoice amount",
+    "qty": 1.0,
+    "category": "Other",
+}
+
+_STUB_TEMPLATE = {
+    "schema_version": "invoice_v1",
+    "notes": {
+        "warnings": [
+            "LLM stub enabled: configure PIPELINE_LLM_API_BASE and "
+            "PIPELINE_LLM_API_KEY to enable the real extractor.",
+        ],
+        "confidence": 0.0,
+    },
+}
+
+
 def generate_stub_response(messages: List[Dict]) -> str:
     """
     Generate a stub response from the message list.
@@ -36,20 +62,10 @@ def generate_stub_response(messages: List[Dict]) -> str:
     invoice_number = extract_invoice_number(user_payload)
     invoice_date = extract_date(user_payload)
     
-    subtotal = find_amount(
-        user_payload, ["subtotal", "sub total", "net amount", "net subtotal"]
-    )
-    tax = find_amount(user_payload, ["tax", "vat", "sales tax"])
-    total = find_amount(
-        user_payload,
-        [
-            "amount due",
-            "balance due",
-            "total",
-            "total due",
-            "amount payable",
-        ],
-    )
+    amounts = find_amounts(user_payload)
+    subtotal = amounts["subtotal"]
+    tax = amounts["tax"]
+    total = amounts["total"]
 
     # Default value calculation
     if total is None:
@@ -59,48 +75,37 @@ def generate_stub_response(messages: List[Dict]) -> str:
         subtotal = total
 
     if total is None:
-        total = Decimal("0")
+        total = 0.0
 
     if subtotal is None:
-        subtotal = Decimal("0")
+        subtotal = 0.0
 
-    discount = Decimal("0")
+    discount = 0.0
 
     # Tax inference
     if tax is None and subtotal is not None and total is not None:
-        tax = max(total - subtotal + discount, Decimal("0"))
+        tax = max(total - subtotal + discount, 0.0)
 
+    total_cents = to_cents(total)
     payload = {
-        "schema_version": "invoice_v1",
+        **_STUB_TEMPLATE,
         "invoice": {
+            **_STUB_INVOICE_DEFAULTS,
             "invoice_number": invoice_number,
             "invoice_date": invoice_date,
             "vendor_name": vendor,
-            "vendor_tax_id": None,
-            "buyer_name": None,
-            "currency_code": "UNK",
             "subtotal_cents": to_cents(subtotal),
             "tax_cents": to_cents(tax),
-            "total_cents": to_cents(total),
+            "total_cents": total_cents,
             "discount_cents": to_cents(discount),
         },
         "items": [
             {
-                "idx": 1,
-                "description": "Total invoice amount",
-                "qty": 1.0,
-                "unit_price_cents": to_cents(total),
-                "line_total_cents": to_cents(total),
-                "category": "Other",
+                **_STUB_ITEM_DEFAULTS,
+                "unit_price_cents": total_cents,
+                "line_total_cents": total_cents,
             }
         ],
-        "notes": {
-            "warnings": [
-                "LLM stub enabled: configure PIPELINE_LLM_API_BASE and "
-                "PIPELINE_LLM_API_KEY to enable the real extractor.",
-            ],
-            "confidence": 0.0,
-        },
     }
 
     return json.dumps(payload)
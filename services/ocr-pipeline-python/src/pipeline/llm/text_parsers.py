@@ -7,8 +7,7 @@ from OCR text, including dates, amounts, invoice numbers, etc.
 
 import re
 from datetime import date
-from decimal import Decimal, InvalidOperation
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 def extract_invoice_number(text: str) -> Optional[str]:
@@ -68,7 +67,7 @@ def extract_date(text: str) -> str:
     return date.today().isoformat()
 
 
-def find_amount(text: str, keywords: List[str]) -> Optional[Decimal]:
+def find_amount(text: str, keywords: List[str]) -> Optional[float]:
     """
     Search for lines with certain keywords and extract an amount.
     
@@ -77,7 +76,7 @@ def find_amount(text: str, keywords: List[str]) -> Optional[Decimal]:
         keywords: List of keywords to look for (e.g., ["total", "subtotal"])
         
     Returns:
-        Amount as Decimal or None if not found
+        Amount as float or None if not found
     """
     for line in iter_lines(text):
         lower = line.lower()
@@ -88,9 +87,62 @@ def find_amount(text: str, keywords: List[str]) -> Optional[Decimal]:
     return None
 
 
-def extract_number(text: str) -> Optional[Decimal]:
+# Summary keywords, one named group per bucket so a match reports its category
+# directly (match.lastgroup). Longer keywords come first so "subtotal" is never
+# classified as "total". Only keywords are consumed, so several labels sharing
+# a line ("total tax", "taxable subtotal") are all seen.
+_AMOUNT_KEYWORD_RE = re.compile(
+    r"(?P<subtotal>net subtotal|net amount|sub ?total)"
+    r"|(?P<tax>sales tax|tax|vat)"
+    r"|(?P<total>amount due|balance due|total due|amount payable|total)",
+    re.IGNORECASE,
+)
+
+
+def find_amounts(text: str) -> Dict[str, Optional[float]]:
+    """
+    Extract subtotal, tax and total amounts in a single pass over the text.
+
+    Like find_amount(), every bucket takes the first number of the first line
+    that mentions one of its keywords. A line that also names a subtotal or
+    tax (e.g. "Total Tax 12.00") is not used for the total. Scanning stops
+    once all buckets are filled.
+
+    Args:
+        text: Text to search in
+
+    Returns:
+        Dict with "subtotal", "tax" and "total" keys (None when not found)
+    """
+    results: Dict[str, Optional[float]] = {
+        "subtotal": None,
+        "tax": None,
+        "total": None,
+    }
+    pending = len(results)
+    for line in text.splitlines():
+        buckets = {match.lastgroup for match in _AMOUNT_KEYWORD_RE.finditer(line)}
+        if not buckets:
+            continue
+        if len(buckets) > 1:
+            buckets.discard("total")
+        if all(results[bucket] is not None for bucket in buckets):
+            continue
+        amount = extract_number(line)
+        if amount is None:
+            continue
+        for bucket in buckets:
+            if results[bucket] is None:
+                results[bucket] = amount
+                pending -= 1
+        if not pending:
+            break
+    return results
+
+
+def extract_number(text: str) -> Optional[float]:
     """
-    Normalize locale separators (dots/commas/spaces) and convert to Decimal.
+    Normalize locale separators (dots/commas/spaces) and convert to float.
     
     Handles different numeric formats:
     - 1,234.56 (US)
@@ -101,7 +153,7 @@ def extract_number(text: str) -> Optional[Decimal]:
         text: Text containing the number
         
     Returns:
-        Number as Decimal or None if extraction fails
+        Number as float or None if extraction fails
     """
     match = re.search(r"[-+]?\d[\d., ]*", text)
     if not match:
@@ -127,24 +179,24 @@ def extract_number(text: str) -> Optional[Decimal]:
         normalized = normalized.replace(",", ".")
 
     try:
-        return Decimal(normalized)
-    except (InvalidOperation, ValueError):
+        return float(normalized)
+    except ValueError:
         return None
 
 
-def to_cents(value: Optional[Decimal]) -> int:
+def to_cents(value: Optional[float]) -> int:
     """
-    Convert a Decimal to cents (integer).
+    Convert an amount to cents (integer).
     
     Args:
-        value: Decimal value or None
+        value: Amount or None
         
     Returns:
         Value in cents as integer (0 if value is None)
     """
     if value is None:
         return 0
-    return int((value * 100).quantize(Decimal("1")))
+    return int(round(value * 100))
 
 
 def iter_lines(text: str) -> List[str]:
@@ -2,12 +2,10 @@
 
 from __future__ import annotations
 
-import json
-from typing import Any, Dict
-
 from loguru import logger
+from pydantic import ValidationError
 
-from src.pipeline.schema.invoice_v1 import InvoiceV1, validate_invoice_payload
+from src.pipeline.schema.invoice_v1 import InvoiceV1, validate_invoice_json
 
 
 class InvalidLLMResponse(Exception):
@@ -22,14 +20,14 @@ def parse_response(raw: str) -> InvoiceV1:
         if raw.startswith("json"):
             raw = raw[4:].strip()
     try:
-        payload: Dict[str, Any] = json.loads(raw)
-    except json.JSONDecodeError as exc:
-        raise InvalidLLMResponse("LLM returned invalid JSON") from exc
-
-    try:
-        # Let Pydantic handle schema validation so we get consistent error messages.
-        validated = validate_invoice_payload(payload)
-        logger.debug("LLM response validated successfully")
-        return validated
+        # Let Pydantic parse and validate in a single pass so we get consistent error messages.
+        validated = validate_invoice_json(raw)
+    except ValidationError as exc:
+        if any(err.get("type") == "json_invalid" for err in exc.errors()):
+            raise InvalidLLMResponse("LLM returned invalid JSON") from exc
+        raise InvalidLLMResponse("LLM returned data outside the contract") from exc
     except Exception as exc:  # noqa: BLE001
         raise InvalidLLMResponse("LLM returned data outside the contract") from exc
+
+    logger.debug("LLM response validated successfully")
+    return validated
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
-from pydantic import BaseModel, Field, validator
+from typing import List, Optional, TypedDict
+from pydantic import BaseModel, Field, field_validator
+
+
+# Version of the normalized payload contract; bump to re-normalize cached records
+SCHEMA_VERSION = "invoice_v1"
 
 
 class Invoice(BaseModel):
@@ -18,14 +22,16 @@ class Invoice(BaseModel):
     total_cents: int
     discount_cents: int = 0
 
-    @validator("invoice_date", pre=True, always=True)
-    def normalize_date(cls, value):  # noqa: N805
+    @field_validator("invoice_date", mode="before")
+    @classmethod
+    def normalize_date(cls, value):
         if value in (None, "", "null"):
             return None
         return value
 
-    @validator("discount_cents", pre=True, always=True)
-    def normalize_discount(cls, value):  # noqa: N805
+    @field_validator("discount_cents", mode="before")
+    @classmethod
+    def normalize_discount(cls, value):
         if value in (None, "", "null"):
             return 0
         try:
@@ -49,8 +55,24 @@ class Notes(BaseModel):
     confidence: Optional[float] = Field(default=None, ge=0.0, le=1.0)
 
 
+# Plain-dict shapes used while post-processing a validated response; they are
+# wrapped back into Item/Notes (without re-validation) when building InvoiceV1.
+class ItemDict(TypedDict):
+    idx: int
+    description: str
+    qty: float
+    unit_price_cents: Optional[int]
+    line_total_cents: int
+    category: Optional[str]
+
+
+class NotesDict(TypedDict):
+    warnings: Optional[List[str]]
+    confidence: Optional[float]
+
+
 class InvoiceV1(BaseModel):
-    schema_version: str = Field(default="invoice_v1")
+    schema_version: str = Field(default=SCHEMA_VERSION)
     invoice: Invoice
     items: List[Item]
     notes: Optional[Notes] = None
@@ -58,3 +80,8 @@ class InvoiceV1(BaseModel):
 
 def validate_invoice_payload(payload: dict) -> InvoiceV1:
     return InvoiceV1.model_validate(payload)
+
+
+def validate_invoice_json(raw: str | bytes) -> InvoiceV1:
+    # Parse and validate in one pass inside pydantic-core (no intermediate dict).
+    return InvoiceV1.model_validate_json(raw)
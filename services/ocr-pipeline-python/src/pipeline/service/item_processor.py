@@ -13,7 +13,7 @@ from __future__ import annotations
 import re
 from typing import List
 
-from src.pipeline.schema.invoice_v1 import Invoice, Item
+from src.pipeline.schema.invoice_v1 import Invoice, ItemDict
 
 
 # ============================================================================
@@ -21,7 +21,7 @@ from src.pipeline.schema.invoice_v1 import Invoice, Item
 # ============================================================================
 
 
-def merge_descriptor_items(items: List[Item], invoice: Invoice) -> List[Item]:
+def merge_descriptor_items(items: List[ItemDict], invoice: Invoice) -> List[ItemDict]:
     """
     Merge descriptor lines with their parent items.
     
@@ -39,7 +39,7 @@ def merge_descriptor_items(items: List[Item], invoice: Invoice) -> List[Item]:
     if not items:
         return items
 
-    merged: List[Item] = []
+    merged: List[ItemDict] = []
     
     for item in items:
         if not merged:
@@ -52,8 +52,8 @@ def merge_descriptor_items(items: List[Item], invoice: Invoice) -> List[Item]:
 
         # Merge descriptor lines into previous item
         if is_descriptor_line(item, merged[-1], invoice):
-            merged[-1].description = (
-                f"{merged[-1].description} {item.description}".strip()
+            merged[-1]["description"] = (
+                f"{merged[-1]['description']} {item['description']}".strip()
             )
             continue
 
@@ -61,12 +61,18 @@ def merge_descriptor_items(items: List[Item], invoice: Invoice) -> List[Item]:
 
     # Reindex items
     for idx, item in enumerate(merged, start=1):
-        item.idx = idx
+        item["idx"] = idx
     
     return merged
 
 
-def is_summary_only_item(item: Item, invoice: Invoice) -> bool:
+# Keywords that mark an item as a summary line (matched on lowercased text)
+_SUMMARY_KEYWORDS_RE = re.compile(
+    r"discount|shipping|freight|delivery|handling|fees|tax|vat|gst|iva|duty|balance|subtotal"
+)
+
+
+def is_summary_only_item(item: ItemDict, invoice: Invoice) -> bool:
     """
     Check if item is actually a summary line (discount, shipping, tax).
     
@@ -79,27 +85,21 @@ def is_summary_only_item(item: Item, invoice: Invoice) -> bool:
     Returns:
         True if item is a summary line
     """
-    if not item.description:
+    if not item["description"]:
         return False
     
-    description = item.description.lower()
-    
     # Check for summary keywords
-    keywords = (
-        "discount", "shipping", "freight", "delivery", "handling",
-        "fees", "tax", "vat", "gst", "iva", "duty", "balance", "subtotal",
-    )
-    if any(word in description for word in keywords):
+    if _SUMMARY_KEYWORDS_RE.search(item["description"].lower()):
         return True
     
     # Check if amount matches a summary field
-    if item.line_total_cents in {invoice.discount_cents, invoice.tax_cents}:
+    if item["line_total_cents"] in {invoice.discount_cents, invoice.tax_cents}:
         return True
     
     return False
 
 
-def is_descriptor_line(item: Item, previous: Item, invoice: Invoice) -> bool:
+def is_descriptor_line(item: ItemDict, previous: ItemDict, invoice: Invoice) -> bool:
     """
     Check if item is a descriptor line (should merge with previous).
     
@@ -117,37 +117,37 @@ def is_descriptor_line(item: Item, previous: Item, invoice: Invoice) -> bool:
     Returns:
         True if item should be merged with previous
     """
-    if not item.description:
+    if not item["description"]:
         return False
     
     # Must have no price
-    if item.unit_price_cents not in (None, 0):
+    if item["unit_price_cents"] not in (None, 0):
         return False
     
     # Must have no/default quantity
-    if item.qty not in (None, 0, 1, 1.0):
+    if item["qty"] not in (None, 0, 1, 1.0):
         return False
     
     # Must not contain currency amounts
-    if contains_currency_amount(item.description):
+    if contains_currency_amount(item["description"]):
         return False
 
     # Line total should match previous or be negligible
     candidate_totals = {
-        previous.line_total_cents,
+        previous["line_total_cents"],
         invoice.discount_cents,
         invoice.tax_cents,
         None,
         0,
     }
-    if item.line_total_cents not in candidate_totals:
+    if item["line_total_cents"] not in candidate_totals:
         return False
     
     return True
 
 
 # Currency pattern for detecting amounts in text
-CURRENCY_TOKEN = re.compile(r"[$€£]|(\d+[.,]\d{1,2})")
+CURRENCY_TOKEN = re.compile(r"[$€£]|(\d+[.,]\d{1,2})", re.ASCII)
 
 
 def contains_currency_amount(text: str) -> bool:
@@ -222,6 +222,13 @@ def totals_are_consistent(invoice: Invoice) -> bool:
     return abs(expected_total - invoice.total_cents) <= tolerance
 
 
+# LLM warnings about total mismatches (matched on lowercased text)
+_TOTAL_MISMATCH_WARNING_RE = re.compile(
+    r"total and subtotal disagree|total line items and invoice total disagree|"
+    r"line item sum does not match|total line item amount"
+)
+
+
 def filter_false_positive_warnings(warnings: List[str], invoice: Invoice) -> List[str]:
     """
     Remove warnings that are false positives due to consistent totals.
@@ -243,19 +250,10 @@ def filter_false_positive_warnings(warnings: List[str], invoice: Invoice) -> Lis
     
     if totals_are_consistent(invoice):
         # Remove total mismatch warnings if amounts are actually consistent
-        phrases = (
-            "total and subtotal disagree",
-            "total line items and invoice total disagree",
-            "line item sum does not match",
-            "total line item amount",
-        )
-        
-        lowered = []
-        for warning in cleaned:
-            if any(phrase in warning.lower() for phrase in phrases):
-                continue
-            lowered.append(warning)
-        
-        cleaned = lowered
+        cleaned = [
+            warning
+            for warning in cleaned
+            if not _TOTAL_MISMATCH_WARNING_RE.search(warning.lower())
+        ]
     
     return cleaned
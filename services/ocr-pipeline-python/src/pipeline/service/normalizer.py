@@ -19,7 +19,7 @@ Key Patterns Fixed:
 from __future__ import annotations
 
 import re
-from decimal import Decimal, InvalidOperation
+from bisect import bisect_left
 from typing import Dict, Optional
 
 from loguru import logger
@@ -54,6 +54,20 @@ def normalize_invoice_amounts(invoice: Invoice) -> None:
     if discount < 0:
         discount = 0
 
+    # Fast path: the LLM already returned exactly consistent, non-negative
+    # totals. None of the patterns or inferences below can change them then
+    # (tax <= total rules out Pattern 4), so skip the whole analysis.
+    if (
+        subtotal is not None
+        and tax is not None
+        and total is not None
+        and subtotal >= 0
+        and 0 <= tax <= total
+        and subtotal + tax - discount == total
+    ):
+        invoice.discount_cents = discount
+        return
+
     # ========================================================================
     # PATTERN DETECTION & CORRECTION
     # ========================================================================
@@ -282,20 +296,32 @@ def recompute_discount(invoice: Invoice, discount_locked: bool = False) -> None:
 
 
 # Regex patterns for extracting summary values from OCR text
-SUMMARY_LABEL_PATTERN = re.compile(
-    r"(Subtotal|Sub-total|Total|Balance Due|Discount(?:\s*\([^)]*\))?|"
+_SUMMARY_LABEL_BODY = (
+    r"Subtotal|Sub-total|Total|Balance Due|Discount(?:\s*\([^)]*\))?|"
     r"Shipping|Freight|Delivery|Handling|Fees|Charge|Tax(?!\s+Id)|"
-    r"Sales Tax|VAT|GST|IVA|Duty)\s*:?",
-    re.IGNORECASE,
+    r"Sales Tax|VAT|GST|IVA|Duty"
+)
+_AMOUNT_BODY = r"[-+]?\d[\d,]*[.,]\d{1,2}"
+
+SUMMARY_LABEL_PATTERN = re.compile(
+    rf"({_SUMMARY_LABEL_BODY})\s*:?",
+    re.IGNORECASE | re.ASCII,
 )
 
 AMOUNT_PATTERN = re.compile(
-    r"(?:[$€£]\s*)?([-+]?\d[\d,]*[.,]\d{1,2})",
+    rf"(?:[$€£]\s*)?({_AMOUNT_BODY})",
     re.IGNORECASE,
 )
 
+# Labels and amounts in one alternation so the text is tokenized in a single
+# pass, in document order (ASCII mode avoids Unicode class expansion).
+SUMMARY_TOKEN_RE = re.compile(
+    rf"(?P<label>{_SUMMARY_LABEL_BODY})\s*:?|(?:[$€£]\s*)?(?P<amount>{_AMOUNT_BODY})",
+    re.IGNORECASE | re.ASCII,
+)
+
 
-def extract_summary_values(text: str) -> Dict[str, int]:
+def extract_summary_values(text: str, text_lower: Optional[str] = None) -> Dict[str, int]:
     """
     Extract monetary amounts from invoice summary section.
 
@@ -304,6 +330,7 @@ def extract_summary_values(text: str) -> Dict[str, int]:
 
     Args:
         text: OCR extracted text
+        text_lower: ``text.lower()`` if the caller already has it
 
     Returns:
         Dictionary mapping normalized labels to amounts in cents
@@ -311,34 +338,42 @@ def extract_summary_values(text: str) -> Dict[str, int]:
     """
     summary: Dict[str, int] = {}
 
-    # Find all labels and amounts
-    label_matches = list(SUMMARY_LABEL_PATTERN.finditer(text))
-    if not label_matches:
-        return summary
-
-    amount_matches = list(AMOUNT_PATTERN.finditer(text))
-    if not amount_matches:
-        return summary
+    # Lowercasing may change length for some Unicode input; only reuse the
+    # caller's copy when offsets still line up with the original text.
+    if text_lower is None or len(text_lower) != len(text):
+        text_lower = text.lower()
 
-    # Filter out percentages (numbers followed by % or in discount context)
+    # Single pass: collect labels and valid amounts in document order.
+    # first_amount_after[i] is the index of the first valid amount after label i,
+    # so amounts between two labels are a contiguous slice of valid_amounts.
+    label_matches = []
+    first_amount_after = []
     valid_amounts = []
-    for amount_match in amount_matches:
-        after_pos = amount_match.end()
-        after_text = text[after_pos : after_pos + 3].strip()
-        before_text = text[max(0, amount_match.start() - 15) : amount_match.start()]
+    for token in SUMMARY_TOKEN_RE.finditer(text):
+        if token.lastgroup == "label":
+            label_matches.append(token)
+            first_amount_after.append(len(valid_amounts))
+            continue
 
-        # Skip if it's a percentage
+        # Filter out percentages (numbers followed by % or in discount context)
+        after_pos = token.end()
+        after_text = text[after_pos : after_pos + 3].strip()
         if after_text.startswith("%") or (
-            after_text.startswith(")") and "discount" in before_text.lower()
+            after_text.startswith(")")
+            and text_lower.find("discount", max(0, token.start() - 15), token.start()) != -1
         ):
             continue
 
-        valid_amounts.append(amount_match)
+        valid_amounts.append(token)
 
-    if not valid_amounts:
+    if not label_matches or not valid_amounts:
         return summary
 
-    used_amounts = set()
+    # Amount start offsets are strictly increasing (finditer order), so the
+    # candidates after a label are found by bisection; used_amounts is a
+    # bitmap indexed like valid_amounts.
+    amount_starts = [amt.start() for amt in valid_amounts]
+    used_amounts = bytearray(len(valid_amounts))
 
     # Max distance between label and amount (80 chars = same/next line)
     MAX_AMOUNT_LABEL_DISTANCE = 80
@@ -352,17 +387,11 @@ def extract_summary_values(text: str) -> Dict[str, int]:
 
         # Extend the group while labels are consecutive
         while j < len(label_matches):
-            prev_label_end = label_matches[j - 1].end()
-            curr_label_start = label_matches[j].start()
-
-            # Check if there are amounts between labels
-            amounts_between = [
-                amt
-                for amt in valid_amounts
-                if amt not in used_amounts
-                and amt.start() >= prev_label_end
-                and amt.start() < curr_label_start
-            ]
+            # Check if there are unused amounts between labels
+            amounts_between = any(
+                not used_amounts[k]
+                for k in range(first_amount_after[j - 1], first_amount_after[j])
+            )
 
             if amounts_between:
                 break  # Break the group
@@ -374,7 +403,7 @@ def extract_summary_values(text: str) -> Dict[str, int]:
         if len(group_labels) == 1:
             # Single label: find closest amount after it
             label_match = group_labels[0]
-            label_text = label_match.group(1)
+            label_text = label_match.group("label")
             label_end = label_match.end()
 
             # Find boundary (next label or end of text)
@@ -384,28 +413,22 @@ def extract_summary_values(text: str) -> Dict[str, int]:
                 else len(text)
             )
 
-            # Find closest amount
+            # Closest amount = first unused one after the label, as long as it
+            # is before the next label and within distance
             closest_amount = None
-            min_distance = float("inf")
-
-            for amt in valid_amounts:
-                if amt in used_amounts:
-                    continue
-
-                # Amount must appear after label and within distance
-                if not (amt.start() >= label_end and amt.start() < next_label_start):
-                    continue
-
-                distance = amt.start() - label_end
-                if distance > MAX_AMOUNT_LABEL_DISTANCE:
-                    continue
-
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_amount = amt
+            for k in range(bisect_left(amount_starts, label_end), len(valid_amounts)):
+                start = amount_starts[k]
+                if (
+                    start >= next_label_start
+                    or start - label_end > MAX_AMOUNT_LABEL_DISTANCE
+                ):
+                    break
+                if not used_amounts[k]:
+                    closest_amount = k
+                    break
 
-            if closest_amount:
-                amount_str = closest_amount.group(1)
+            if closest_amount is not None:
+                amount_str = valid_amounts[closest_amount].group("amount")
                 cents = parse_amount_to_cents(amount_str)
                 if cents is not None:
                     normalized = normalize_summary_label(label_text)
@@ -413,30 +436,31 @@ def extract_summary_values(text: str) -> Dict[str, int]:
                         summary["addition"] = summary.get("addition", 0) + cents
                     elif normalized and normalized not in summary:
                         summary[normalized] = cents
-                    used_amounts.add(closest_amount)
+                    used_amounts[closest_amount] = 1
 
         else:
             # Multiple labels in group: find amounts after last label
             last_label_end = group_labels[-1].end()
 
             # Find amounts after last label within distance
-            amounts_after = [
-                amt
-                for amt in valid_amounts
-                if amt not in used_amounts
-                and amt.start() >= last_label_end
-                and amt.start() - last_label_end <= MAX_AMOUNT_LABEL_DISTANCE
-            ]
+            amounts_after = []
+            for k in range(
+                bisect_left(amount_starts, last_label_end), len(valid_amounts)
+            ):
+                if amount_starts[k] - last_label_end > MAX_AMOUNT_LABEL_DISTANCE:
+                    break
+                if not used_amounts[k]:
+                    amounts_after.append(k)
 
             # Match labels to amounts in order
             for k, label_match in enumerate(group_labels):
                 if k >= len(amounts_after):
                     break
 
-                label_text = label_match.group(1)
-                amount_match = amounts_after[k]
+                label_text = label_match.group("label")
+                amount_idx = amounts_after[k]
 
-                amount_str = amount_match.group(1)
+                amount_str = valid_amounts[amount_idx].group("amount")
                 cents = parse_amount_to_cents(amount_str)
                 if cents is None:
                     continue
@@ -447,7 +471,7 @@ def extract_summary_values(text: str) -> Dict[str, int]:
                 elif normalized and normalized not in summary:
                     summary[normalized] = cents
 
-                used_amounts.add(amount_match)
+                used_amounts[amount_idx] = 1
 
         # Move to next group
         i = j if j > i else i + 1
@@ -455,6 +479,9 @@ def extract_summary_values(text: str) -> Dict[str, int]:
     return summary
 
 
+_CURRENCY_STRIP = str.maketrans("", "", "$€£ ")
+
+
 def parse_amount_to_cents(value: str) -> Optional[int]:
     """
     Parse amount string to cents (integer).
@@ -474,9 +501,8 @@ def parse_amount_to_cents(value: str) -> Optional[int]:
     if not cleaned:
         return None
 
-    # Remove currency symbols
-    cleaned = cleaned.replace("$", "").replace("€", "").replace("£", "")
-    cleaned = cleaned.replace(" ", "")
+    # Remove currency symbols and spaces in one C-level pass
+    cleaned = cleaned.translate(_CURRENCY_STRIP)
 
     # Handle multiple separators
     if cleaned.count(",") > 1 and "." not in cleaned:
@@ -497,12 +523,46 @@ def parse_amount_to_cents(value: str) -> Optional[int]:
         # Single separator: assume comma is decimal (European default)
         cleaned = cleaned.replace(",", ".")
 
-    try:
-        cents = int(round(Decimal(cleaned) * 100))
-    except InvalidOperation:
+    # Integer arithmetic on the digit strings (no Decimal construction)
+    negative = cleaned.startswith("-")
+    if cleaned[:1] in ("+", "-"):
+        cleaned = cleaned[1:]
+    int_part, _, frac_part = cleaned.partition(".")
+    if not (int_part or frac_part) or not (int_part + frac_part).isdigit():
         return None
 
-    return cents
+    cents = int(int_part or "0") * 100 + int((frac_part + "00")[:2])
+    if len(frac_part) > 2:
+        # Round the extra decimals half-to-even, as round(Decimal) did
+        rest = int(frac_part[2:])
+        half = 5 * 10 ** (len(frac_part) - 3)
+        if rest > half or (rest == half and cents % 2):
+            cents += 1
+
+    return -cents if negative else cents
+
+
+# Lowercased SUMMARY_LABEL_PATTERN literals -> normalized summary field
+_SUMMARY_LABEL_MAP = {
+    "subtotal": "subtotal",
+    "sub-total": "subtotal",
+    "discount": "discount",
+    "rebate": "discount",
+    "total": "total",
+    "balance due": "total",
+    "shipping": "addition",
+    "freight": "addition",
+    "delivery": "addition",
+    "handling": "addition",
+    "fees": "addition",
+    "charge": "addition",
+    "tax": "addition",
+    "sales tax": "addition",
+    "vat": "addition",
+    "gst": "addition",
+    "iva": "addition",
+    "duty": "addition",
+}
 
 
 def normalize_summary_label(label: str) -> Optional[str]:
@@ -517,6 +577,12 @@ def normalize_summary_label(label: str) -> Optional[str]:
     """
     lower = label.lower()
 
+    # Labels captured by SUMMARY_TOKEN_RE come from a closed vocabulary, so
+    # an exact lookup resolves them without the substring scans below.
+    normalized = _SUMMARY_LABEL_MAP.get(lower.split("(", 1)[0].strip())
+    if normalized is not None:
+        return normalized
+
     if "subtotal" in lower or "sub-total" in lower:
         return "subtotal"
 
@@ -6,7 +6,8 @@ for better maintainability and readability.
 
 New Module Structure:
 ---------------------
-- orchestrator.py: Main pipeline entry point (run_pipeline)
+- orchestrator.py: Main pipeline entry points (run_pipeline, run_pipeline_batch,
+  run_pipeline_async, run_many, load_cached_result)
 - normalizer.py: Amount normalization and LLM error correction
 - item_processor.py: Line item merging and validation
 - validators.py: Field validation and text utilities
@@ -26,6 +27,18 @@ Both imports point to the same implementation - choose based on your preference.
 """
 
 # Re-export the main pipeline function from the orchestrator
-from .orchestrator import run_pipeline
-
-__all__ = ["run_pipeline"]
+from .orchestrator import (
+    load_cached_result,
+    run_many,
+    run_pipeline,
+    run_pipeline_async,
+    run_pipeline_batch,
+)
+
+__all__ = [
+    "run_pipeline",
+    "run_pipeline_async",
+    "run_pipeline_batch",
+    "run_many",
+    "load_cached_result",
+]
@@ -10,7 +10,8 @@ This module provides validation functions for:
 from __future__ import annotations
 
 import re
-from datetime import datetime
+from calendar import isleap
+from typing import Optional
 
 from src.pipeline.schema.invoice_v1 import InvoiceV1
 
@@ -39,17 +40,37 @@ def validate_required_fields(model: InvoiceV1) -> None:
         raise ValueError("items missing in LLM response")
 
 
+# Same fields strptime("%Y-%m-%d") accepts (ASCII digits only; the day may be
+# space-padded, e.g. "2024-3- 3")
+_ISO_DATE_RE = re.compile(
+    r"(\d{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])",
+    re.ASCII,
+)
+_DAYS_IN_MONTH = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
 def validate_iso_date(value: str) -> None:
     """
     Validate date is in YYYY-MM-DD format.
 
+    Uses a regex plus range checks instead of strptime (no datetime
+    allocation). Accepts the same ASCII dates as strptime("%Y-%m-%d"),
+    including unpadded and space-padded days; non-ASCII digits, which
+    strptime lets through in some fields, are rejected.
+
     Raises:
         ValueError: If date format is invalid
     """
-    try:
-        datetime.strptime(value, "%Y-%m-%d")
-    except ValueError as exc:
-        raise ValueError(f"Invalid date {value}") from exc
+    match = _ISO_DATE_RE.fullmatch(value)
+    if match:
+        year, month, day = map(int, match.groups())
+        if (
+            year >= 1
+            and day <= _DAYS_IN_MONTH[month - 1]
+            and (month != 2 or day != 29 or isleap(year))
+        ):
+            return
+    raise ValueError(f"Invalid date {value}")
 
 
 # ============================================================================
@@ -105,14 +126,50 @@ def compact_prompt_text(text: str) -> str:
     return text.strip()
 
 
-def dynamic_completion_budget(page_count: int) -> int:
+# Lines that look like an item row: leading index/qty, or text ending in an amount.
+# Whitespace never crosses lines, and the letter check is a lookahead so a long
+# line without an amount is rejected in one pass instead of backtracking per letter.
+_LINE_ITEM_ROW = re.compile(
+    r"^(?:[ \t]*\d+[.)]?[ \t]+\S.*|(?=[^\n]*[A-Za-z])[^\n]*\d[.,]\d{2})[ \t]*$",
+    re.MULTILINE,
+)
+
+# Smallest completion budget for a content-sized request (header + one item)
+_MIN_COMPLETION_BUDGET = 256
+
+
+def estimate_line_items(text: str) -> int:
+    """
+    Roughly count line items in OCR text (single regex pass).
+
+    Summary rows ("Total 12.00") are counted too; overestimating only
+    costs a few completion tokens, underestimating may truncate the JSON.
+    """
+    return sum(1 for _ in _LINE_ITEM_ROW.finditer(text))
+
+
+def dynamic_completion_budget(
+    page_count: int,
+    compact_len: Optional[int] = None,
+    estimated_line_items: int = 0,
+) -> int:
     """
     Scale completion tokens with document size.
 
+    When the compacted prompt length is known the budget follows the
+    expected output (header + ~40 tokens per item + text density), so
+    short single-page receipts don't reserve a full page-based budget and
+    dense documents are not truncated at 1024.
+
     Args:
         page_count: Number of pages in document
+        compact_len: Length of the compacted text sent to the LLM
+        estimated_line_items: Item rows found by estimate_line_items
 
     Returns:
-        int: Max tokens for LLM completion (caps at 1024)
+        int: Max tokens for LLM completion (between 256 and 2048)
     """
-    return min(1024, 256 + 120 * max(1, page_count))
+    if compact_len is None:
+        return min(1024, 256 + 120 * max(1, page_count))
+    content_budget = 200 + 40 * estimated_line_items + compact_len // 40
+    return min(2048, max(_MIN_COMPLETION_BUDGET, content_budget))
@@ -17,6 +17,7 @@ from sqlalchemy import (
     String,
     Text,
     create_engine,
+    delete,
     select,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
@@ -33,8 +34,16 @@ class Document(Base):
     id = Column(Integer, primary_key=True)
     path = Column(String, nullable=False)
     file_hash = Column(String, nullable=True, unique=True, index=True)
+    response_hash = Column(String, nullable=True, index=True)
     raw_text = Column(Text, nullable=False)
     raw_json = Column(Text, nullable=False)
+    # Unnormalized LLM output + the schema it was normalized to, so payloads can
+    # be rebuilt locally after a schema change without calling the LLM again
+    raw_llm_response = Column(Text, nullable=True)
+    schema_version = Column(String, nullable=True)
+    # JSON list of [page, body length] pairs; with raw_text it rebuilds the
+    # page-annotated text the response was normalized against
+    page_layout = Column(Text, nullable=True)
 
     invoice_number = Column(String, nullable=True)
     invoice_date = Column(String, nullable=False)
@@ -123,20 +132,32 @@ def init_db() -> None:
 init_db()
 
 
-def _ensure_discount_column() -> None:
-    with engine.connect() as conn:
+# Columns added after the first release; create_all() does not alter existing tables.
+_LATE_COLUMNS = {
+    "discount_cents": "ALTER TABLE invoices ADD COLUMN discount_cents INTEGER NOT NULL DEFAULT 0",
+    "response_hash": "ALTER TABLE invoices ADD COLUMN response_hash VARCHAR",
+    "raw_llm_response": "ALTER TABLE invoices ADD COLUMN raw_llm_response TEXT",
+    "schema_version": "ALTER TABLE invoices ADD COLUMN schema_version VARCHAR",
+    "page_layout": "ALTER TABLE invoices ADD COLUMN page_layout TEXT",
+}
+
+
+def _ensure_late_columns() -> None:
+    with engine.begin() as conn:
         result = conn.execute(text("PRAGMA table_info(invoices)"))
         columns = {row[1] for row in result}
-        if "discount_cents" not in columns:
-            conn.execute(
-                text(
-                    "ALTER TABLE invoices "
-                    "ADD COLUMN discount_cents INTEGER NOT NULL DEFAULT 0"
-                )
+        for name, ddl in _LATE_COLUMNS.items():
+            if name not in columns:
+                conn.execute(text(ddl))
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_invoices_response_hash "
+                "ON invoices (response_hash)"
             )
+        )
 
 
-_ensure_discount_column()
+_ensure_late_columns()
 
 
 @contextmanager
@@ -166,10 +187,57 @@ def get_document_by_hash(file_hash: Optional[str]) -> Optional[dict]:
         return json.loads(result.raw_json)
 
 
+def get_cached_document(file_hash: Optional[str]) -> Optional[dict]:
+    # Like get_document_by_hash, plus what is needed to re-normalize the record.
+    if not file_hash:
+        return None
+    with session_scope() as session:
+        result = session.execute(
+            select(Document).where(Document.file_hash == file_hash)
+        ).scalar_one_or_none()
+        if not result:
+            return None
+        return {
+            "payload": json.loads(result.raw_json),
+            "path": result.path,
+            "raw_text": result.raw_text,
+            "raw_llm_response": result.raw_llm_response,
+            "page_layout": (
+                json.loads(result.page_layout) if result.page_layout else None
+            ),
+            "schema_version": result.schema_version,
+        }
+
+
+def get_document_by_response_hash(response_hash: Optional[str]) -> Optional[dict]:
+    # Second-level cache: identical LLM response + OCR text normalizes identically.
+    if not response_hash:
+        return None
+    with session_scope() as session:
+        raw_json = session.execute(
+            select(Document.raw_json)
+            .where(Document.response_hash == response_hash)
+            .limit(1)
+        ).scalar_one_or_none()
+        if raw_json is None:
+            return None
+        return json.loads(raw_json)
+
+
 def save_document(
-    path: str, file_hash: Optional[str], raw_text: str, payload: dict
+    path: str,
+    file_hash: Optional[str],
+    raw_text: str,
+    payload: dict,
+    response_hash: Optional[str] = None,
+    raw_llm_response: Optional[str] = None,
+    schema_version: Optional[str] = None,
+    page_layout: Optional[list] = None,
+    replace: bool = False,
 ) -> int:
     # Persist both the denormalised JSON and the structured tables for querying/reporting.
+    # replace=True rewrites an existing record with the same file hash (and its items)
+    # in place, so concurrent replaces never race on the unique file_hash.
     warnings = None
     confidence = None
     notes = payload.get("notes")
@@ -179,26 +247,46 @@ def save_document(
 
     invoice = payload["invoice"]
 
+    fields = dict(
+        path=path,
+        file_hash=file_hash,
+        response_hash=response_hash,
+        raw_text=raw_text,
+        raw_json=json.dumps(payload, ensure_ascii=False),
+        raw_llm_response=raw_llm_response,
+        schema_version=schema_version,
+        page_layout=json.dumps(page_layout) if page_layout is not None else None,
+        invoice_number=invoice.get("invoice_number"),
+        invoice_date=invoice["invoice_date"],
+        vendor_name=invoice["vendor_name"],
+        vendor_tax_id=invoice.get("vendor_tax_id"),
+        buyer_name=invoice.get("buyer_name"),
+        currency_code=invoice["currency_code"],
+        subtotal_cents=invoice.get("subtotal_cents"),
+        tax_cents=invoice.get("tax_cents"),
+        total_cents=invoice["total_cents"],
+        discount_cents=invoice.get("discount_cents", 0),
+        confidence=confidence,
+        warnings=warnings,
+    )
+
     with session_scope() as session:
-        doc = Document(
-            path=path,
-            file_hash=file_hash,
-            raw_text=raw_text,
-            raw_json=json.dumps(payload, ensure_ascii=False),
-            invoice_number=invoice.get("invoice_number"),
-            invoice_date=invoice["invoice_date"],
-            vendor_name=invoice["vendor_name"],
-            vendor_tax_id=invoice.get("vendor_tax_id"),
-            buyer_name=invoice.get("buyer_name"),
-            currency_code=invoice["currency_code"],
-            subtotal_cents=invoice.get("subtotal_cents"),
-            tax_cents=invoice.get("tax_cents"),
-            total_cents=invoice["total_cents"],
-            discount_cents=invoice.get("discount_cents", 0),
-            confidence=confidence,
-            warnings=warnings,
-        )
-        session.add(doc)
+        doc = None
+        if replace and file_hash:
+            doc = session.execute(
+                select(Document).where(Document.file_hash == file_hash)
+            ).scalar_one_or_none()
+
+        if doc is not None:
+            for name, value in fields.items():
+                setattr(doc, name, value)
+            # Core delete: no per-row stale checks if another replace got here first
+            session.execute(
+                delete(InvoiceItem).where(InvoiceItem.document_id == doc.id)
+            )
+        else:
+            doc = Document(**fields)
+            session.add(doc)
         session.flush()
 
         for item in payload.get("items", []):
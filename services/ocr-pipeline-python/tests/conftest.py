@@ -0,0 +1,13 @@
+"""Shared fixtures: run the pipeline modules against a throwaway SQLite file."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Must be set before src.pipeline.storage.db is imported (it connects at import)
+os.environ["DB_URL"] = f"sqlite:///{Path(tempfile.mkdtemp()) / 'test.db'}"
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
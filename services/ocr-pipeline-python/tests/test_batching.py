@@ -0,0 +1,165 @@
+import json
+import re
+import uuid
+
+import pytest
+
+from src.pipeline.llm.groq_client import RequestTooLargeError
+from src.pipeline.llm.prompts import BATCH_SYSTEM_PROMPT, SYSTEM_PROMPT
+from src.pipeline.llm.rate_limiter import LLMRateLimiter
+from src.pipeline.service import orchestrator
+
+DOCUMENT_TEXT = "--- Page 1 ---\nACME\nWidget 10.00\nTotal 10.00"
+
+
+def _invoice(number: str) -> dict:
+    return {
+        "invoice": {
+            "invoice_number": number,
+            "invoice_date": "2024-01-02",
+            "vendor_name": "ACME",
+            "currency_code": "USD",
+            "subtotal_cents": 1000,
+            "tax_cents": 0,
+            "total_cents": 1000,
+        },
+        "items": [
+            {
+                "idx": 1,
+                "description": "Widget",
+                "qty": 1,
+                "unit_price_cents": 1000,
+                "line_total_cents": 1000,
+            }
+        ],
+    }
+
+
+class FakeLLM:
+    """Stands in for call_llm; answers batched and single prompts."""
+
+    def __init__(self, skip_docs=(), invalid_docs=(), reject_batches=False):
+        self.calls = []
+        self.system_prompts = []
+        self.skip_docs = set(skip_docs)
+        self.invalid_docs = set(invalid_docs)
+        self.reject_batches = reject_batches
+
+    def __call__(self, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        numbers = [int(n) for n in re.findall(r"<<DOC (\d+)>>", prompt)]
+        self.calls.append(len(numbers) or 1)
+        self.system_prompts.append(messages[0]["content"])
+        if not numbers:
+            return json.dumps(_invoice("single"))
+        if self.reject_batches:
+            raise RequestTooLargeError("too large")
+        return json.dumps(
+            {
+                "documents": [
+                    {"doc": n, "invoice": "unreadable"}
+                    if n in self.invalid_docs
+                    else dict(_invoice(f"batch-{n}"), doc=n)
+                    for n in numbers
+                    if n not in self.skip_docs
+                ]
+            }
+        )
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(orchestrator, "call_llm", llm)
+    monkeypatch.setattr(
+        orchestrator,
+        "_prepare_document",
+        lambda path, file_hash: orchestrator._PreparedDocument(
+            path=path,
+            file_hash=file_hash,
+            text=DOCUMENT_TEXT,
+            compact_text=DOCUMENT_TEXT,
+            raw_text=DOCUMENT_TEXT,
+            page_layout=[(1, len(DOCUMENT_TEXT))],
+            page_count=1,
+        ),
+    )
+    return llm
+
+
+def _files(tmp_path, count):
+    paths = []
+    for _ in range(count):
+        path = tmp_path / f"{uuid.uuid4().hex}.pdf"
+        path.write_bytes(uuid.uuid4().bytes)
+        paths.append(str(path))
+    return paths
+
+
+def _numbers(results):
+    return [result["invoice"]["invoice_number"] for result in results]
+
+
+def test_batch_shares_one_llm_call(tmp_path, fake_llm):
+    results = orchestrator.run_pipeline_batch(_files(tmp_path, 3), batch_size=8)
+
+    assert fake_llm.calls == [3]
+    assert fake_llm.system_prompts == [BATCH_SYSTEM_PROMPT]
+    assert _numbers(results) == ["batch-1", "batch-2", "batch-3"]
+
+
+def test_batch_respects_batch_size(tmp_path, fake_llm):
+    orchestrator.run_pipeline_batch(_files(tmp_path, 5), batch_size=2)
+
+    assert fake_llm.calls == [2, 2, 1]
+
+
+def test_missing_batch_entries_fall_back_to_single_calls(tmp_path, fake_llm):
+    fake_llm.skip_docs = {2}
+
+    results = orchestrator.run_pipeline_batch(_files(tmp_path, 3), batch_size=8)
+
+    assert fake_llm.calls == [3, 1]
+    assert _numbers(results) == ["batch-1", "single", "batch-3"]
+
+
+def test_invalid_batch_entries_fall_back_to_single_calls(tmp_path, fake_llm):
+    fake_llm.invalid_docs = {2}
+
+    results = orchestrator.run_pipeline_batch(_files(tmp_path, 3), batch_size=8)
+
+    assert fake_llm.calls == [3, 1]
+    assert fake_llm.system_prompts == [BATCH_SYSTEM_PROMPT, SYSTEM_PROMPT]
+    assert _numbers(results) == ["batch-1", "single", "batch-3"]
+
+
+def test_oversized_batch_falls_back_to_single_calls(tmp_path, fake_llm):
+    fake_llm.reject_batches = True
+
+    results = orchestrator.run_pipeline_batch(_files(tmp_path, 2), batch_size=8)
+
+    assert fake_llm.calls == [2, 1, 1]
+    assert _numbers(results) == ["single", "single"]
+
+
+def test_groups_fit_rate_limiter_capacity(tmp_path, fake_llm, monkeypatch):
+    documents = [
+        orchestrator._prepare_document(path, None) for path in _files(tmp_path, 4)
+    ]
+    two_docs = orchestrator._estimate_batch_tokens(documents[:2])
+    limiter = LLMRateLimiter(tpm_limit=two_docs, tpd_limit=two_docs * 100)
+    monkeypatch.setattr(orchestrator, "get_rate_limiter", lambda: limiter)
+
+    groups = orchestrator._group_documents(documents, batch_size=8)
+
+    assert [len(group) for group in groups] == [2, 2]
+
+
+def test_repeated_files_are_processed_once(tmp_path, fake_llm):
+    first, second = _files(tmp_path, 2)
+
+    results = orchestrator.run_pipeline_batch([first, second, first], batch_size=8)
+
+    assert fake_llm.calls == [2]
+    assert results[2] == results[0]
+    assert results[2] is not results[0]
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from src.pipeline.llm.rate_limiter import LLMRateLimiter
+
+
+def _limiter(inflight_limit: int) -> LLMRateLimiter:
+    return LLMRateLimiter(
+        rpm_limit=100,
+        rpd_limit=1000,
+        tpm_limit=100_000,
+        tpd_limit=1_000_000,
+        inflight_limit=inflight_limit,
+    )
+
+
+def _admit_in_thread(limiter: LLMRateLimiter):
+    admitted = threading.Event()
+    result = {}
+
+    def worker():
+        result.update(limiter.check_and_wait(10, tag="test"))
+        admitted.set()
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread, admitted, result
+
+
+def test_inflight_cap_blocks_until_release():
+    limiter = _limiter(inflight_limit=1)
+    first = limiter.check_and_wait(10, tag="test")
+
+    thread, admitted, second = _admit_in_thread(limiter)
+    assert not admitted.wait(0.2)
+
+    limiter.release_inflight(first["entry_id"])
+    assert admitted.wait(2)
+    thread.join(2)
+    limiter.release_inflight(second["entry_id"])
+
+
+def test_cancel_request_frees_inflight_slot():
+    limiter = _limiter(inflight_limit=1)
+    first = limiter.check_and_wait(10, tag="test")
+
+    thread, admitted, second = _admit_in_thread(limiter)
+    assert not admitted.wait(0.2)
+
+    limiter.cancel_request(first["entry_id"])
+    assert admitted.wait(2)
+    thread.join(2)
+    limiter.release_inflight(second["entry_id"])
+
+
+def test_release_inflight_is_idempotent():
+    limiter = _limiter(inflight_limit=1)
+    entry = limiter.check_and_wait(10, tag="test")
+
+    limiter.release_inflight(entry["entry_id"])
+    # A second release must not raise or hand out an extra slot
+    limiter.release_inflight(entry["entry_id"])
+
+    held = limiter.check_and_wait(10, tag="test")
+    thread, admitted, other = _admit_in_thread(limiter)
+    assert not admitted.wait(0.2)
+
+    limiter.release_inflight(held["entry_id"])
+    assert admitted.wait(2)
+    thread.join(2)
+    limiter.release_inflight(other["entry_id"])
+
+
+def test_oversized_request_fails_without_taking_a_slot():
+    limiter = _limiter(inflight_limit=1)
+
+    with pytest.raises(ValueError):
+        limiter.check_and_wait(limiter.max_request_tokens + 1, tag="test")
+
+    entry = limiter.check_and_wait(10, tag="test")
+    limiter.release_inflight(entry["entry_id"])
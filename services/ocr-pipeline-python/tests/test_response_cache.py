@@ -0,0 +1,211 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from src.pipeline.extract.text_extractor import (
+    PageText,
+    join_raw_text,
+    materialize_pages,
+    page_layout,
+)
+from src.pipeline.schema.invoice_v1 import SCHEMA_VERSION
+from src.pipeline.service import orchestrator
+from src.pipeline.storage import db
+
+DOCUMENT_TEXT = "--- Page 1 ---\nACME\nWidget 10.00\nTotal 10.00"
+
+
+def _response(number: str) -> str:
+    return json.dumps(
+        {
+            "invoice": {
+                "invoice_number": number,
+                "invoice_date": "2024-01-02",
+                "vendor_name": "ACME",
+                "currency_code": "USD",
+                "subtotal_cents": 1000,
+                "tax_cents": 0,
+                "total_cents": 1000,
+            },
+            "items": [
+                {
+                    "idx": 1,
+                    "description": "Widget",
+                    "qty": 1,
+                    "unit_price_cents": 1000,
+                    "line_total_cents": 1000,
+                }
+            ],
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def empty_normalized_cache():
+    orchestrator._NORMALIZED_CACHE.clear()
+    yield
+    orchestrator._NORMALIZED_CACHE.clear()
+
+
+def test_response_hash_depends_on_response_and_text():
+    raw = _response("A-1")
+
+    assert orchestrator._response_hash(raw, DOCUMENT_TEXT) == orchestrator._response_hash(
+        raw, DOCUMENT_TEXT
+    )
+    assert orchestrator._response_hash(raw, DOCUMENT_TEXT) != orchestrator._response_hash(
+        raw, DOCUMENT_TEXT + "\n"
+    )
+    assert orchestrator._response_hash(raw, DOCUMENT_TEXT) != orchestrator._response_hash(
+        _response("A-2"), DOCUMENT_TEXT
+    )
+
+
+def test_response_hash_changes_with_normalizer_version(monkeypatch):
+    raw = _response("A-1")
+    before = orchestrator._response_hash(raw, DOCUMENT_TEXT)
+
+    monkeypatch.setattr(orchestrator, "_NORMALIZER_VERSION", "test-next")
+
+    assert orchestrator._response_hash(raw, DOCUMENT_TEXT) != before
+
+
+def test_normalized_payload_is_reused_by_response_hash(monkeypatch):
+    raw = _response(uuid.uuid4().hex)
+    response_hash = orchestrator._response_hash(raw, DOCUMENT_TEXT)
+    first = orchestrator._parse_and_normalize_cached(raw, DOCUMENT_TEXT, response_hash)
+
+    monkeypatch.setattr(
+        orchestrator,
+        "_parse_and_normalize",
+        lambda *args: pytest.fail("normalization should have been cached"),
+    )
+    assert orchestrator._parse_and_normalize_cached(raw, DOCUMENT_TEXT, response_hash) == first
+
+
+def test_persisted_payload_is_reused_by_response_hash(monkeypatch):
+    raw = _response(uuid.uuid4().hex)
+    response_hash = orchestrator._response_hash(raw, DOCUMENT_TEXT)
+    payload = orchestrator._parse_and_normalize(raw, DOCUMENT_TEXT).model_dump(mode="json")
+    db.save_document(
+        "/uploads/a.pdf",
+        uuid.uuid4().hex,
+        DOCUMENT_TEXT,
+        payload,
+        response_hash=response_hash,
+    )
+
+    monkeypatch.setattr(
+        orchestrator,
+        "_parse_and_normalize",
+        lambda *args: pytest.fail("normalization should have come from the database"),
+    )
+    assert orchestrator._parse_and_normalize_cached(raw, DOCUMENT_TEXT, response_hash) == payload
+
+
+PAGES = [
+    PageText(page=1, lines=["ACME", "Widget 10.00"]),
+    PageText(page=2, lines=[]),
+    PageText(page=3, lines=["Total 10.00"]),
+]
+
+
+def _save_stale(raw: str, file_hash: str, layout=None) -> int:
+    joined, raw_text, _ = materialize_pages(PAGES)
+    payload = orchestrator._parse_and_normalize(raw, joined).model_dump(mode="json")
+    return db.save_document(
+        "/uploads/original.pdf",
+        file_hash,
+        raw_text,
+        payload,
+        raw_llm_response=raw,
+        schema_version="invoice_v0",
+        page_layout=layout,
+    )
+
+
+def test_page_layout_rebuilds_the_annotated_text():
+    joined, raw_text, _ = materialize_pages(PAGES)
+
+    assert join_raw_text(raw_text, page_layout(PAGES)) == joined
+
+
+def test_stale_schema_is_rebuilt_in_place():
+    raw = _response(uuid.uuid4().hex)
+    file_hash = uuid.uuid4().hex
+    doc_id = _save_stale(raw, file_hash, layout=page_layout(PAGES))
+
+    result = orchestrator._load_cached("/uploads/duplicate.pdf", file_hash)
+
+    joined, _, _ = materialize_pages(PAGES)
+    assert result == orchestrator._parse_and_normalize(raw, joined).model_dump(mode="json")
+    cached = db.get_cached_document(file_hash)
+    assert cached["schema_version"] == SCHEMA_VERSION
+    assert cached["path"] == "/uploads/original.pdf"
+    with db.session_scope() as session:
+        rows = session.execute(
+            select(db.Document).where(db.Document.file_hash == file_hash)
+        ).scalars().all()
+        assert [row.id for row in rows] == [doc_id]
+        assert rows[0].response_hash == orchestrator._response_hash(raw, joined)
+        assert len(rows[0].items) == len(result["items"])
+
+
+def test_records_without_page_layout_are_returned_as_stored(monkeypatch):
+    raw = _response(uuid.uuid4().hex)
+    file_hash = uuid.uuid4().hex
+    _save_stale(raw, file_hash)
+    stored = db.get_cached_document(file_hash)["payload"]
+    monkeypatch.setattr(
+        orchestrator,
+        "save_document",
+        lambda *args, **kwargs: pytest.fail("record should not be rewritten"),
+    )
+
+    assert orchestrator._load_cached("/uploads/new.pdf", file_hash) == stored
+
+
+def test_failed_rebuild_falls_through_to_a_fresh_run(monkeypatch):
+    raw = _response(uuid.uuid4().hex)
+    file_hash = uuid.uuid4().hex
+    doc_id = _save_stale(raw, file_hash, layout=page_layout(PAGES))
+    joined, raw_text, _ = materialize_pages(PAGES)
+    normalize = orchestrator._parse_and_normalize
+    calls = []
+
+    def fails_once(raw, document_text):
+        calls.append(raw)
+        if len(calls) == 1:
+            raise ValueError("normalizer changed")
+        return normalize(raw, document_text)
+
+    monkeypatch.setattr(orchestrator, "_parse_and_normalize", fails_once)
+    monkeypatch.setattr(
+        orchestrator,
+        "_prepare_document",
+        lambda path, file_hash: orchestrator._PreparedDocument(
+            path=path,
+            file_hash=file_hash,
+            text=joined,
+            compact_text=joined,
+            raw_text=raw_text,
+            page_layout=page_layout(PAGES),
+            page_count=len(PAGES),
+        ),
+    )
+    monkeypatch.setattr(orchestrator, "_call_llm_single", lambda document: raw)
+
+    result = orchestrator.run_pipeline("/uploads/new.pdf", precomputed_hash=file_hash)
+
+    assert len(calls) == 2
+    cached = db.get_cached_document(file_hash)
+    assert cached["payload"] == result
+    assert cached["schema_version"] == SCHEMA_VERSION
+    # The fresh run replaces the stale record instead of clashing with it
+    with db.session_scope() as session:
+        ids = session.execute(
+            select(db.Document.id).where(db.Document.file_hash == file_hash)
+        ).scalars().all()
+        assert ids == [doc_id]
@@ -0,0 +1,37 @@
+from src.pipeline.llm.text_parsers import find_amounts
+
+
+def test_find_amounts_reads_each_label():
+    text = "Subtotal 90.00\nTax 10.00\nTotal 100.00"
+
+    assert find_amounts(text) == {"subtotal": 90.0, "tax": 10.0, "total": 100.0}
+
+
+def test_find_amounts_keeps_first_match_per_label():
+    text = "Total 100.00\nTotal 999.00"
+
+    assert find_amounts(text)["total"] == 100.0
+
+
+def test_find_amounts_tax_wins_over_total_on_shared_line():
+    text = "Total Tax 12.00\nTotal 100.00"
+
+    assert find_amounts(text) == {"subtotal": None, "tax": 12.0, "total": 100.0}
+
+
+def test_find_amounts_fills_every_label_sharing_a_line():
+    result = find_amounts("Taxable subtotal 20.00")
+
+    assert result["subtotal"] == 20.0
+    assert result["tax"] == 20.0
+    assert result["total"] is None
+
+
+def test_find_amounts_skips_labels_without_numbers():
+    text = "Total\nTotal due 55.50"
+
+    assert find_amounts(text)["total"] == 55.5
+
+
+def test_find_amounts_without_labels():
+    assert find_amounts("Widget 10.00") == {"subtotal": None, "tax": None, "total": None}
@@ -0,0 +1,50 @@
+import time
+
+from src.pipeline.service.validators import (
+    dynamic_completion_budget,
+    estimate_line_items,
+)
+
+
+def _budget(text: str, page_count: int = 1) -> int:
+    return dynamic_completion_budget(
+        page_count,
+        compact_len=len(text),
+        estimated_line_items=estimate_line_items(text),
+    )
+
+
+def test_one_line_invoice_gets_less_than_the_page_budget():
+    page_budget = dynamic_completion_budget(1)
+
+    assert _budget("ACME Widget 10.00") < page_budget
+
+
+def test_budget_has_a_floor():
+    assert _budget("") == 256
+
+
+def test_dense_document_can_exceed_the_page_cap():
+    rows = "\n".join(f"{n} Widget model {n} 10.00" for n in range(1, 41))
+
+    assert _budget(rows, page_count=3) > dynamic_completion_budget(3)
+    assert _budget(rows * 10, page_count=3) == 2048
+
+
+def test_page_budget_without_prompt_length():
+    assert dynamic_completion_budget(1) == 376
+    assert dynamic_completion_budget(10) == 1024
+
+
+def test_estimate_line_items_counts_item_rows():
+    text = "ACME Corp\n1 Widget 10.00\nGadget 5,50\n2) Cable\nThank you\nTotal 15.50"
+
+    assert estimate_line_items(text) == 4
+
+
+def test_estimate_line_items_is_linear_on_long_lines():
+    line = "ab1 " * 5000
+
+    started = time.perf_counter()
+    assert estimate_line_items(line) == 0
+    assert time.perf_counter() - started < 0.5